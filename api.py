@@ -0,0 +1,219 @@
+import asyncio
+import math
+import os
+import re
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+import instrumentation
+import market_data
+import news
+import news_refresher
+import universe
+from chat_assistant import generate_response
+from finance_calculator import calculate_savings
+from synthetic_data import PERIOD_DAYS
+
+API_HOST = os.environ.get("API_HOST", "127.0.0.1")
+API_PORT = int(os.environ.get("API_PORT", 8000))
+
+PERIODS = set(PERIOD_DAYS) | {"ytd"}
+TICKER = re.compile(r"^[A-Za-z0-9.\-^=]{1,15}$")
+
+# Numeric /screener query parameters, passed straight to universe.screen
+SCREEN_BOUNDS = [
+    "min_pe", "max_pe", "min_dividend_yield", "min_market_cap", "max_market_cap", "min_change", "max_change",
+]
+SCREEN_LIMIT = 100
+SCREEN_MAX_LIMIT = 500
+
+# How long /news waits for the shared refresher to fetch a query it hasn't stored yet
+NEWS_WAIT = float(os.environ.get("NEWS_API_WAIT", 5))
+
+# Quote fields returned by /quote, in the order the Stock Lookup page shows them
+QUOTE_FIELDS = [
+    "longName", "sector", "regularMarketPrice", "previousClose", "marketCap", "trailingPE",
+    "dividendYield", "fiftyTwoWeekHigh", "fiftyTwoWeekLow", "volume", "averageVolume",
+]
+
+
+def jsonable(value):
+    """numpy scalars to Python numbers and NaN/inf to None, so responses are strict JSON."""
+    if isinstance(value, dict):
+        return {key: jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [jsonable(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def error(status, message):
+    return JSONResponse({"error": message}, status_code=status)
+
+
+def _ticker_and_period(request):
+    ticker = request.path_params["ticker"]
+    period = request.query_params.get("period", "1mo")
+    if not TICKER.match(ticker):
+        return None, None, error(400, f"Invalid ticker {ticker!r}")
+    if period not in PERIODS:
+        return None, None, error(400, f"Invalid period {period!r}, use one of {sorted(PERIODS)}")
+    return ticker.upper(), period, None
+
+
+async def quote(request):
+    ticker, period, problem = _ticker_and_period(request)
+    if problem:
+        return problem
+    try:
+        stock, info, hist = await run_in_threadpool(market_data.get_stock_data, ticker, period)
+    except Exception as e:
+        return error(502, f"Error retrieving data: {e}")
+
+    last_close = float(hist['Close'].iloc[-1]) if not hist.empty else None
+    return JSONResponse(jsonable({
+        "ticker": ticker,
+        "demo": stock == "demo",
+        "replay": stock == "replay",
+        "simulated": bool(hist.attrs.get("simulated")),
+        "lastClose": last_close,
+        **{field: info.get(field) for field in QUOTE_FIELDS},
+    }))
+
+
+async def history(request):
+    ticker, period, problem = _ticker_and_period(request)
+    if problem:
+        return problem
+    try:
+        _, _, hist = await run_in_threadpool(market_data.get_stock_data, ticker, period)
+    except Exception as e:
+        return error(502, f"Error retrieving data: {e}")
+
+    columns = [column for column in market_data.HISTORY_COLUMNS if column in hist]
+    rows = [
+        {"date": date.isoformat(), **dict(zip(columns, values))}
+        for date, values in zip(hist.index, hist[columns].itertuples(index=False, name=None))
+    ]
+    return JSONResponse(jsonable({
+        "ticker": ticker,
+        "period": period,
+        "simulated": bool(hist.attrs.get("simulated")),
+        "history": rows,
+    }))
+
+
+async def financial_news(request):
+    # Served from the store the Financial News page uses, so clients never scrape on their own
+    query = request.query_params.get("q") or None
+    store = news_refresher.store
+    refresher = news_refresher.start_refresher()
+
+    deadline = asyncio.get_running_loop().time() + NEWS_WAIT
+    while True:
+        articles, fetched_at = store.get(query)
+        if articles:
+            return JSONResponse({"query": query, "demo": False, "articles": articles[:news.MAX_ARTICLES],
+                                 "fetched_at": fetched_at})
+        if not store.record_query(query):
+            break
+        # New queries are fetched right away by the refresher; wait a little for it
+        refresher.request_refresh()
+        if asyncio.get_running_loop().time() >= deadline:
+            return JSONResponse({"query": query, "demo": True, "refreshing": True,
+                                 "articles": news.demo_articles(query)})
+        await asyncio.sleep(0.1)
+
+    # Same fallback as the Financial News page: demo articles when live news can't be fetched
+    return JSONResponse({"query": query, "demo": True, "articles": news.demo_articles(query),
+                         "error": store.status()["last_error"]})
+
+
+async def news_status(request):
+    # Refresh time, staleness, pending queries and stored entries of the shared news store
+    return JSONResponse(jsonable(news_refresher.store.status()))
+
+
+async def chat(request):
+    try:
+        message = (await request.json()).get("message", "")
+    except (ValueError, AttributeError):
+        return error(400, 'Expected a JSON body like {"message": "..."}')
+    if not isinstance(message, str) or not message.strip():
+        return error(400, "message must be a non-empty string")
+
+    # Keyword routing takes microseconds, so it runs on the event loop
+    return JSONResponse({"message": message, "response": generate_response(message)})
+
+
+async def savings(request):
+    try:
+        income = float(request.query_params["income"])
+        expenses = float(request.query_params["expenses"])
+    except (KeyError, ValueError):
+        return error(400, "income and expenses are required numbers")
+    if not (math.isfinite(income) and math.isfinite(expenses)):
+        return error(400, "income and expenses must be finite")
+
+    amount, rate = calculate_savings(income, expenses)
+    return JSONResponse({"income": income, "expenses": expenses, "savings": amount, "savings_rate": rate})
+
+
+async def screener(request):
+    params = request.query_params
+    try:
+        bounds = {name: float(params[name]) for name in SCREEN_BOUNDS if params.get(name)}
+        limit = int(params.get("limit", SCREEN_LIMIT))
+    except ValueError:
+        return error(400, f"{', '.join(SCREEN_BOUNDS)} and limit must be numbers")
+    if not 1 <= limit <= SCREEN_MAX_LIMIT:
+        return error(400, f"limit must be between 1 and {SCREEN_MAX_LIMIT}")
+    sort_by = params.get("sort", "market_cap")
+    if sort_by not in universe.SORT_COLUMNS:
+        return error(400, f"Invalid sort {sort_by!r}, use one of {list(universe.SORT_COLUMNS)}")
+
+    table = universe.load_universe()
+    # Screen without the limit so "matches" counts every ticker that passed the filters
+    matches = universe.screen(table, sectors=params.getlist("sector"), sort_by=sort_by,
+                              ascending=params.get("order") == "asc", **bounds)
+    result = matches.iloc[:limit]
+    rows = [{"ticker": ticker, **row} for ticker, row in zip(result.index, result.to_dict("records"))]
+    return JSONResponse(jsonable({"universe": len(table), "matches": len(matches), "limit": limit,
+                                  "returned": len(rows), "results": rows}))
+
+
+async def health(request):
+    return JSONResponse({"status": "ok"})
+
+
+async def metrics(request):
+    # Stage timings recorded in this process, in the Prometheus text format
+    return PlainTextResponse(instrumentation.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
+routes = [
+    Route("/health", health),
+    Route("/metrics", metrics),
+    Route("/quote/{ticker}", quote),
+    Route("/history/{ticker}", history),
+    Route("/news", financial_news),
+    Route("/news/status", news_status),
+    Route("/screener", screener),
+    Route("/chat", chat, methods=["POST"]),
+    Route("/savings", savings),
+]
+
+app = Starlette(routes=routes)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=API_HOST, port=API_PORT)
@@ -1,15 +1,24 @@
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
-import yfinance as yf
-from datetime import datetime, timedelta
-import requests
-from bs4 import BeautifulSoup
+import os
 import time
-import random
+import uuid
 import json
 import numpy as np
 
+import charts
+from chat_assistant import generate_response
+from chat_history import CHAT_PAGE_SIZE, ChatHistory
+import finance_calculator
+from finance_calculator import calculate_savings
+import indicators
+import instrumentation
+import market_data
+import news
+import news_refresher
+import portfolio
+import universe
+
 # Page configuration
 st.set_page_config(
     page_title="Simple Financial Assistant",
@@ -17,437 +26,58 @@ st.set_page_config(
     layout="wide"
 )
 
+# Timing for the whole rerun, plus an optional cProfile capture of it
+rerun_started = time.perf_counter()
+profiler = instrumentation.start_profile(st.session_state.get("profile_reruns"))
+
 # Sidebar navigation
 page = st.sidebar.selectbox(
     "Navigation",
-    ["Home", "Stock Lookup", "Personal Finance Calculator", "Financial News", "Chat Assistant"]
+    ["Home", "Stock Lookup", "Stock Screener", "Portfolio", "Personal Finance Calculator", "Financial News",
+     "Chat Assistant"]
 )
 
-# Demo stock data for common stocks
-DEMO_STOCKS = {
-    "AAPL": {
-        "name": "Apple Inc.",
-        "price": 169.75,
-        "change": 1.23,
-        "percent_change": 0.73,
-        "market_cap": "2.67T",
-        "sector": "Technology",
-        "pe_ratio": 28.12,
-        "dividend_yield": 0.54,
-        "description": "Apple Inc. designs, manufactures, and markets smartphones, personal computers, tablets, wearables, and accessories worldwide."
-    },
-    "MSFT": {
-        "name": "Microsoft Corporation",
-        "price": 415.32,
-        "change": 2.45,
-        "percent_change": 0.59,
-        "market_cap": "3.09T",
-        "sector": "Technology",
-        "pe_ratio": 35.67,
-        "dividend_yield": 0.73,
-        "description": "Microsoft Corporation develops, licenses, and supports software, services, devices, and solutions worldwide."
-    },
-    "GOOGL": {
-        "name": "Alphabet Inc.",
-        "price": 147.68,
-        "change": -0.87,
-        "percent_change": -0.59,
-        "market_cap": "1.85T",
-        "sector": "Technology",
-        "pe_ratio": 25.34,
-        "dividend_yield": 0.0,
-        "description": "Alphabet Inc. provides various products and platforms in the United States, Europe, the Middle East, Africa, the Asia-Pacific, Canada, and Latin America."
-    },
-    "AMZN": {
-        "name": "Amazon.com, Inc.",
-        "price": 178.75,
-        "change": 1.05,
-        "percent_change": 0.59,
-        "market_cap": "1.86T",
-        "sector": "Consumer Cyclical",
-        "pe_ratio": 61.23,
-        "dividend_yield": 0.0,
-        "description": "Amazon.com, Inc. engages in the retail sale of consumer products and subscriptions in North America and internationally."
-    },
-    "TSLA": {
-        "name": "Tesla, Inc.",
-        "price": 176.75,
-        "change": -3.25,
-        "percent_change": -1.81,
-        "market_cap": "562.5B",
-        "sector": "Automotive",
-        "pe_ratio": 50.12,
-        "dividend_yield": 0.0,
-        "description": "Tesla, Inc. designs, develops, manufactures, leases, and sells electric vehicles, and energy generation and storage systems."
-    }
-}
-
 # Function to get stock data with fallback to demo data
 def get_stock_data(ticker, period="1mo"):
-    ticker = ticker.upper()
-    
-    # Check if we have demo data for this ticker
-    if ticker in DEMO_STOCKS:
-        # Use demo data
-        demo_data = DEMO_STOCKS[ticker]
-        
-        # Create a stock info dictionary
-        info = {
-            "longName": demo_data["name"],
-            "regularMarketPrice": demo_data["price"],
-            "previousClose": demo_data["price"] - demo_data["change"],
-            "sector": demo_data["sector"],
-            "trailingPE": demo_data["pe_ratio"],
-            "dividendYield": demo_data["dividend_yield"] / 100 if demo_data["dividend_yield"] > 0 else None,
-            "longBusinessSummary": demo_data["description"]
-        }
-        
-        # Convert market cap string to number
-        market_cap_str = demo_data["market_cap"]
-        if market_cap_str.endswith("T"):
-            info["marketCap"] = float(market_cap_str.replace("T", "")) * 1_000_000_000_000
-        elif market_cap_str.endswith("B"):
-            info["marketCap"] = float(market_cap_str.replace("B", "")) * 1_000_000_000
-        elif market_cap_str.endswith("M"):
-            info["marketCap"] = float(market_cap_str.replace("M", "")) * 1_000_000
-        
-        # Generate historical data
-        end_date = datetime.now()
-        
-        if period == "1mo":
-            start_date = end_date - timedelta(days=30)
-        elif period == "3mo":
-            start_date = end_date - timedelta(days=90)
-        elif period == "6mo":
-            start_date = end_date - timedelta(days=180)
-        elif period == "1y":
-            start_date = end_date - timedelta(days=365)
-        else:
-            start_date = end_date - timedelta(days=30)
-        
-        date_range = pd.date_range(start=start_date, end=end_date)
-        
-        # Generate price data with a slight upward or downward trend based on current change
-        trend = 0.0002 if demo_data["percent_change"] > 0 else -0.0002
-        
-        # Start with the current price and work backwards
-        current_price = demo_data["price"]
-        prices = [current_price]
-        
-        # Generate random price movements with the trend
-        random.seed(hash(ticker))  # Use ticker as seed for consistent randomness
-        
-        for i in range(1, len(date_range)):
-            change = random.uniform(-0.02, 0.02) + trend  # Random daily change with trend
-            new_price = prices[-1] / (1 + change)  # Work backwards
-            prices.append(new_price)
-        
-        prices.reverse()  # Reverse to get chronological order
-        
-        # Create a DataFrame with the sample data
-        hist = pd.DataFrame({
-            'Open': prices,
-            'High': [p * random.uniform(1, 1.02) for p in prices],
-            'Low': [p * random.uniform(0.98, 1) for p in prices],
-            'Close': prices,
-            'Volume': [random.randint(1000000, 10000000) for _ in prices]
-        }, index=date_range)
-        
-        return "demo", info, hist
-    
-    # If not in demo data, try to get real data
     try:
-        # Try to use yfinance
-        stock = yf.Ticker(ticker)
-        
-        try:
-            info = stock.info
-            if not info or len(info) < 5:  # If we got minimal or no data
-                raise ValueError("Limited data available")
-        except:
-            # Create a fallback info dictionary
-            info = {
-                "longName": ticker,
-                "regularMarketPrice": None,
-                "previousClose": None,
-                "marketCap": None,
-                "sector": "Unknown",
-                "trailingPE": None,
-                "dividendYield": None,
-                "longBusinessSummary": f"Information for {ticker} is currently unavailable."
-            }
-        
-        # Try to get historical data
-        try:
-            hist = stock.history(period=period)
-            if hist.empty:
-                raise ValueError("No historical data")
-        except:
-            # Create sample historical data
-            end_date = datetime.now()
-            start_date = end_date - timedelta(days=30)
-            
-            if period == "3mo":
-                start_date = end_date - timedelta(days=90)
-            elif period == "6mo":
-                start_date = end_date - timedelta(days=180)
-            elif period == "1y":
-                start_date = end_date - timedelta(days=365)
-            
-            date_range = pd.date_range(start=start_date, end=end_date)
-            
-            # Generate random price movements
-            base_price = 100  # Default base price
-            
-            prices = [base_price]
-            for i in range(1, len(date_range)):
-                change = random.uniform(-0.02, 0.02)
-                new_price = prices[-1] * (1 + change)
-                prices.append(new_price)
-            
-            hist = pd.DataFrame({
-                'Open': prices,
-                'High': [p * 1.01 for p in prices],
-                'Low': [p * 0.99 for p in prices],
-                'Close': prices,
-                'Volume': [random.randint(1000000, 10000000) for _ in prices]
-            }, index=date_range)
-            
-            st.info(f"Using simulated data for {ticker}. Real-time data is unavailable.")
-        
-        return stock, info, hist
-    
+        stock, info, hist = market_data.get_stock_data(ticker, period)
     except Exception as e:
         st.error(f"Error retrieving data: {str(e)}")
-        
+
         # Return empty data
         return None, {}, pd.DataFrame()
 
+    if hist.attrs.get("simulated"):
+        st.info(f"Using simulated data for {ticker.upper()}. Real-time data is unavailable.")
+
+    return stock, info, hist
+
+# Show a rendered chart, timing the hand-off to the browser separately from rendering
+def show_chart(image):
+    with instrumentation.timer("chart.display"):
+        st.image(image, use_column_width=True)
+
 # Function to get financial news
 def get_financial_news(query=None):
     try:
-        # Base URL for Yahoo Finance
-        base_url = "https://finance.yahoo.com"
-        
-        # If query is provided, search for specific news
-        if query:
-            search_url = f"{base_url}/search?q={query}"
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(search_url, headers=headers)
-        else:
-            # Otherwise get the latest news from the main page
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            response = requests.get(base_url, headers=headers)
-        
-        # Check if the request was successful
-        if response.status_code != 200:
-            st.error(f"Failed to fetch news: HTTP {response.status_code}")
-            return []
-        
-        # Parse the HTML content
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find news articles
-        articles = []
-        
-        # Look for different possible article containers
-        news_items = soup.select('li.js-stream-content, div.Ov\(h\), div.Cf')
-        
-        if not news_items:
-            # Try alternative selectors if the first ones don't work
-            news_items = soup.select('div.NewsArticle, div.StretchedBox')
-        
-        # If still no results, try a more generic approach
-        if not news_items:
-            # Look for any div with a title and link that might be a news item
-            for div in soup.find_all('div', class_=True):
-                if div.find('a') and (div.find('h3') or div.find('h4')):
-                    news_items.append(div)
-        
-        # Process found items
-        for item in news_items[:10]:  # Limit to 10 articles
-            # Try to extract title, link, and source
-            title_tag = item.select_one('h3, h4, a.js-content-viewer')
-            link_tag = item.select_one('a[href]')
-            
-            if title_tag and link_tag:
-                title = title_tag.text.strip()
-                link = link_tag.get('href')
-                
-                # Make sure link is absolute
-                if link.startswith('/'):
-                    link = base_url + link
-                
-                # Find source/publisher if available
-                source_tag = item.select_one('span.provider-name')
-                source = source_tag.text.strip() if source_tag else "Yahoo Finance"
-                
-                # Only add if we have a title and it's not a duplicate
-                if title and not any(a.get('title') == title for a in articles):
-                    articles.append({
-                        'title': title,
-                        'link': link,
-                        'source': source
-                    })
-        
-        # If we still don't have any articles, provide a fallback with demo articles
-        if not articles:
-            # Demo financial news articles
-            articles = [
-                {
-                    "title": "Markets Rally as Fed Signals Potential Rate Cuts",
-                    "link": "https://finance.yahoo.com/news/markets-rally-fed-signals-potential-rate-cuts",
-                    "source": "Yahoo Finance"
-                },
-                {
-                    "title": "Tech Stocks Lead Market Gains Amid AI Optimism",
-                    "link": "https://finance.yahoo.com/news/tech-stocks-lead-market-gains-ai-optimism",
-                    "source": "Reuters"
-                },
-                {
-                    "title": "Oil Prices Stabilize After Recent Volatility",
-                    "link": "https://finance.yahoo.com/news/oil-prices-stabilize-recent-volatility",
-                    "source": "Bloomberg"
-                },
-                {
-                    "title": "Retail Sales Exceed Expectations in Latest Report",
-                    "link": "https://finance.yahoo.com/news/retail-sales-exceed-expectations-latest-report",
-                    "source": "CNBC"
-                },
-                {
-                    "title": "Housing Market Shows Signs of Cooling as Mortgage Rates Rise",
-                    "link": "https://finance.yahoo.com/news/housing-market-shows-signs-cooling-mortgage-rates-rise",
-                    "source": "Wall Street Journal"
-                }
-            ]
+        articles, demo = news.get_news(query)
+        if demo:
             st.info("Using demo financial news articles. Live data is currently unavailable.")
-        
-        return articles[:10]  # Return up to 10 articles
+        return articles
     
+    except news.NewsFetchError as e:
+        st.error(f"Failed to fetch news: {str(e)}")
+        return []
+
     except Exception as e:
         st.error(f"Error fetching financial news: {str(e)}")
         
         # Return demo articles as fallback
-        return [
-            {
-                "title": "Markets Rally as Fed Signals Potential Rate Cuts",
-                "link": "https://finance.yahoo.com/news/markets-rally-fed-signals-potential-rate-cuts",
-                "source": "Yahoo Finance"
-            },
-            {
-                "title": "Tech Stocks Lead Market Gains Amid AI Optimism",
-                "link": "https://finance.yahoo.com/news/tech-stocks-lead-market-gains-ai-optimism",
-                "source": "Reuters"
-            },
-            {
-                "title": "Oil Prices Stabilize After Recent Volatility",
-                "link": "https://finance.yahoo.com/news/oil-prices-stabilize-recent-volatility",
-                "source": "Bloomberg"
-            }
-        ]
-
-# Function for personal finance calculations
-def calculate_savings(income, expenses):
-    savings = income - expenses
-    savings_rate = (savings / income) * 100 if income > 0 else 0
-    return savings, savings_rate
-
-# Function to generate chatbot responses
-def generate_response(user_input):
-    """Generate a response based on the user's input"""
-    user_input = user_input.lower().strip()
-    
-    # Check for stock tickers (common ones)
-    stock_tickers = {
-        "aapl": "Apple Inc. (AAPL)",
-        "msft": "Microsoft Corporation (MSFT)",
-        "googl": "Alphabet Inc. (GOOGL)",
-        "amzn": "Amazon.com Inc. (AMZN)",
-        "tsla": "Tesla Inc. (TSLA)",
-        "meta": "Meta Platforms Inc. (META)",
-        "nvda": "NVIDIA Corporation (NVDA)",
-        "nflx": "Netflix Inc. (NFLX)"
-    }
-    
-    # Check if input is a stock ticker
-    if user_input in stock_tickers:
-        return f"Looking for information about {stock_tickers[user_input]}? Head to the Stock Lookup page and enter '{user_input.upper()}' to see current price, charts, and key metrics."
-    
-    # Dictionary of predefined responses for different types of queries
-    responses = {
-        "stock": [
-            "To get stock information, go to the Stock Information page and enter a ticker symbol.",
-            "I can help you find stock data. Try checking the Stock Information page and entering a ticker like 'AAPL' or 'MSFT'.",
-            "Looking for stock data? Head to the Stock Information page and enter the ticker symbol you're interested in."
-        ],
-        "finance": [
-            "For personal finance calculations, visit the Personal Finance page to track expenses and calculate savings.",
-            "Need help with personal finance? Check out the Personal Finance page to manage your expenses and savings.",
-            "Our Personal Finance tool can help you track expenses and calculate potential savings."
-        ],
-        "news": [
-            "For the latest financial news, visit the Financial News page.",
-            "Stay updated with financial news on our Financial News page. You can also search for specific topics.",
-            "Check out the Financial News page for the latest updates on financial markets and trends."
-        ],
-        "hello": [
-            "Hello! How can I help you with your financial questions today?",
-            "Hi there! I'm your financial assistant. What would you like to know?",
-            "Greetings! I'm here to help with your financial queries."
-        ],
-        "help": [
-            "I can help you with stock information, personal finance calculations, and financial news. What would you like to know?",
-            "Need help? You can ask me about stocks, personal finance, or financial news.",
-            "I'm here to assist with your financial questions. Try asking about stocks, personal finance, or the latest news."
-        ],
-        "price": [
-            "To check stock prices, go to the Stock Lookup page and enter a ticker symbol.",
-            "You can find current stock prices on the Stock Lookup page. Just enter the ticker symbol you're interested in.",
-            "Looking for stock prices? Head to the Stock Lookup page and enter a ticker like 'AAPL' or 'MSFT'."
-        ],
-        "invest": [
-            "For investment information, check out our Stock Lookup page for current data and trends.",
-            "Interested in investing? Our Stock Lookup page provides key metrics and price history for various stocks.",
-            "Investment decisions should be based on thorough research. Our Stock Lookup page can help you get started with data."
-        ],
-        "budget": [
-            "Need help with budgeting? Visit our Personal Finance page to track expenses and calculate savings.",
-            "Budgeting is essential for financial health. Try our Personal Finance calculator to help manage your expenses.",
-            "Our Personal Finance page can help you create a budget by tracking your income and expenses."
-        ],
-        "market": [
-            "For market updates, check our Financial News page for the latest trends and information.",
-            "Stay informed about market movements with our Financial News section.",
-            "The market is always changing. Visit our Financial News page to stay updated."
-        ]
-    }
-    
-    # Check if any keywords match and return a response
-    for keyword, reply_list in responses.items():
-        if keyword in user_input.split():
-            return random.choice(reply_list)
-    
-    # Check for partial matches in longer queries
-    for keyword, reply_list in responses.items():
-        if keyword in user_input:
-            return random.choice(reply_list)
-    
-    # Default responses if no keywords match
-    default_responses = [
-        "I'm your financial assistant. Try asking about stocks, personal finance, or financial news.",
-        "I can help with questions about stocks, personal finance, and financial news. What would you like to know?",
-        "Not sure what you're asking. I can provide information about stocks, personal finance, and financial news.",
-        "Try asking me about specific financial topics like stock prices, budgeting, or market news."
-    ]
-    
-    return random.choice(default_responses)
+        return news.DEMO_ARTICLES[:3]
+
 
 # Home page
-if page == "Home":
+def home_page():
     st.title("💰 Simple Financial Assistant")
     st.write("Welcome to your financial assistant! This app helps you with:")
     
@@ -502,11 +132,10 @@ if page == "Home":
                     # Show a mini chart if we have historical data
                     if not hist.empty:
                         st.subheader("Recent Price History")
-                        fig, ax = plt.subplots(figsize=(10, 4))
-                        ax.plot(hist.index[-10:], hist['Close'][-10:])
-                        ax.set_title(f"{ticker} Recent Price")
-                        ax.grid(True)
-                        st.pyplot(fig)
+                        show_chart(charts.price_chart(
+                            ticker, "1mo", hist[-10:], title=f"{ticker} Recent Price",
+                            kind="recent", figsize=(10, 4), labels=False
+                        ))
                         
                         # Add a button to go to detailed stock page
                         if st.button("View Detailed Stock Information"):
@@ -518,18 +147,20 @@ if page == "Home":
             st.error(f"An error occurred: {str(e)}")
             st.info("Please try another ticker symbol or check your internet connection.")
 
+
 # Stock Lookup page
-elif page == "Stock Lookup":
+def stock_lookup_page():
     def stock_information():
         st.header("📈 Stock Information")
         st.write("Look up real-time stock data, charts, and key metrics.")
         
         # User input for stock ticker
         ticker = st.text_input("Enter a stock ticker (e.g., AAPL):", "").upper()
+        period = st.selectbox("Period", ["1mo", "3mo", "6mo", "1y", "2y", "5y", "max"])
         
         if ticker:
             with st.spinner(f"Fetching data for {ticker}..."):
-                stock, info, hist = get_stock_data(ticker)
+                stock, info, hist = get_stock_data(ticker, period)
                 
                 if stock is not None and not hist.empty:
                     # Display basic stock information
@@ -562,30 +193,51 @@ elif page == "Stock Lookup":
                     # Plot stock price history if we have data
                     if not hist.empty:
                         st.subheader("Price History")
-                        fig, ax = plt.subplots(figsize=(10, 6))
-                        ax.plot(hist.index, hist['Close'])
-                        ax.set_title(f"{ticker} Stock Price")
-                        ax.set_xlabel("Date")
-                        ax.set_ylabel("Price ($)")
-                        ax.grid(True)
-                        st.pyplot(fig)
+                        show_chart(charts.price_chart(ticker, period, hist))
+                        
+                        # Indicators fill in whatever the quote info doesn't provide
+                        with instrumentation.timer("indicators"):
+                            latest = indicators.latest(indicators.get_indicators(ticker, period, hist))
+                        
+                        def metric(key, computed, fmt="{:,.2f}"):
+                            value = info.get(key)
+                            if value is None and computed is not None and not pd.isna(computed):
+                                value = fmt.format(computed)
+                            return value if value is not None else 'N/A'
                         
                         # Show additional metrics
                         st.subheader("Key Metrics")
                         metrics_col1, metrics_col2 = st.columns(2)
                         
                         with metrics_col1:
-                            st.write(f"**52-Week High:** ${info.get('fiftyTwoWeekHigh', 'N/A')}")
-                            st.write(f"**52-Week Low:** ${info.get('fiftyTwoWeekLow', 'N/A')}")
+                            st.write(f"**52-Week High:** ${metric('fiftyTwoWeekHigh', latest.get('High_52W'))}")
+                            st.write(f"**52-Week Low:** ${metric('fiftyTwoWeekLow', latest.get('Low_52W'))}")
                             if 'dividendYield' in info and info['dividendYield'] is not None:
                                 st.write(f"**Dividend Yield:** {info.get('dividendYield', 0) * 100:.2f}%")
                             else:
                                 st.write("**Dividend Yield:** N/A")
                         
                         with metrics_col2:
+                            last_volume = hist['Volume'].iloc[-1] if 'Volume' in hist else None
                             st.write(f"**P/E Ratio:** {info.get('trailingPE', 'N/A')}")
-                            st.write(f"**Volume:** {info.get('volume', 'N/A')}")
-                            st.write(f"**Avg Volume:** {info.get('averageVolume', 'N/A')}")
+                            st.write(f"**Volume:** {metric('volume', last_volume, '{:,.0f}')}")
+                            st.write(f"**Avg Volume:** {metric('averageVolume', latest.get('AvgVolume'), '{:,.0f}')}")
+                        
+                        st.subheader("Technical Indicators")
+                        tech_col1, tech_col2 = st.columns(2)
+                        
+                        def fmt(value, pattern="{:,.2f}"):
+                            return pattern.format(value) if value is not None and not pd.isna(value) else 'N/A'
+                        
+                        with tech_col1:
+                            st.write(f"**SMA (20 / 50):** {fmt(latest.get('SMA_20'))} / {fmt(latest.get('SMA_50'))}")
+                            st.write(f"**EMA (12 / 26):** {fmt(latest.get('EMA_12'))} / {fmt(latest.get('EMA_26'))}")
+                            st.write(f"**RSI (14):** {fmt(latest.get('RSI_14'), '{:.1f}')}")
+                        
+                        with tech_col2:
+                            st.write(f"**MACD / Signal:** {fmt(latest.get('MACD'))} / {fmt(latest.get('MACD_Signal'))}")
+                            st.write(f"**Bollinger Bands:** {fmt(latest.get('BB_Lower'))} - {fmt(latest.get('BB_Upper'))}")
+                            st.write(f"**Volatility (20d, annualized):** {fmt(latest.get('Volatility_20', np.nan) * 100, '{:.1f}%')}")
                     
                     # Show a brief business summary if available
                     if info.get('longBusinessSummary'):
@@ -596,8 +248,154 @@ elif page == "Stock Lookup":
     
     stock_information()
 
+
+# Stock Screener page
+def stock_screener_page():
+    st.title("🔎 Stock Screener")
+    st.write("Filter the ticker universe by sector, valuation, dividends, size and today's move.")
+    
+    table = universe.load_universe()
+    
+    col1, col2 = st.columns(2)
+    
+    # Slider ends mean "no limit", so tickers missing a value are only dropped once a bound is set
+    with col1:
+        sectors = st.multiselect("Sectors", sorted(table["sector"].cat.categories))
+        pe_low, pe_high = st.slider("P/E Ratio", 0.0, 100.0, (0.0, 100.0))
+        min_dividend_yield = st.slider("Minimum Dividend Yield (%)", 0.0, 10.0, 0.0, step=0.1)
+    
+    with col2:
+        min_market_cap = st.number_input("Minimum Market Cap ($B)", min_value=0.0, step=1.0)
+        change_low, change_high = st.slider("Price Change Today (%)", -20.0, 20.0, (-20.0, 20.0), step=0.5)
+        sort_col1, sort_col2 = st.columns(2)
+        sort_columns = {label: column for column, label in universe.SORT_COLUMNS.items()}
+        sort_by = sort_columns[sort_col1.selectbox("Sort By", list(sort_columns))]
+        ascending = sort_col2.radio("Order", ["Descending", "Ascending"]) == "Ascending"
+    
+    started = time.perf_counter()
+    with instrumentation.timer("screener"):
+        results = universe.screen(
+            table,
+            sectors=sectors,
+            min_pe=pe_low if pe_low > 0 else None,
+            max_pe=pe_high if pe_high < 100 else None,
+            min_dividend_yield=min_dividend_yield or None,
+            min_market_cap=min_market_cap * 1e9 if min_market_cap else None,
+            min_change=change_low if change_low > -20 else None,
+            max_change=change_high if change_high < 20 else None,
+            sort_by=sort_by,
+            ascending=ascending,
+        )
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    
+    st.success(f"{len(results):,} of {len(table):,} tickers match ({elapsed_ms:.1f} ms)")
+    
+    # Only the first rows are sent to the browser; the count above covers every match
+    shown = results.head(200).assign(market_cap=results["market_cap"].head(200) / 1e9)
+    st.dataframe(
+        shown,
+        use_container_width=True,
+        column_config={
+            "name": "Company",
+            "sector": "Sector",
+            "price": st.column_config.NumberColumn("Price", format="$%.2f"),
+            "change": st.column_config.NumberColumn("Change", format="%.2f"),
+            "percent_change": st.column_config.NumberColumn("Change (%)", format="%.2f%%"),
+            "market_cap": st.column_config.NumberColumn("Market Cap ($B)", format="%.1f"),
+            "pe_ratio": st.column_config.NumberColumn("P/E", format="%.2f"),
+            "dividend_yield": st.column_config.NumberColumn("Dividend Yield (%)", format="%.2f"),
+        },
+    )
+
+
+# Portfolio page
+def portfolio_page():
+    st.title("💼 Portfolio")
+    st.write("Track your holdings, cost basis, daily P&L and allocation.")
+    
+    # Starting lots until the user imports or edits their own
+    if "portfolio_lots" not in st.session_state:
+        st.session_state.portfolio_lots = pd.DataFrame({
+            "ticker": ["AAPL", "MSFT", "GOOGL", "AAPL"],
+            "shares": [10.0, 5.0, 8.0, 5.0],
+            "cost": [150.0, 380.0, 135.0, 165.0],
+            "date": pd.to_datetime([None, None, None, None]),
+        })
+    
+    uploaded = st.file_uploader("Import lots from a CSV file with ticker, shares, cost and date columns", type="csv")
+    if uploaded is not None and st.session_state.get("portfolio_upload") != uploaded.file_id:
+        st.session_state.portfolio_upload = uploaded.file_id
+        st.session_state.portfolio_lots = portfolio.make_lots(pd.read_csv(uploaded))
+    
+    lots = st.data_editor(
+        st.session_state.portfolio_lots,
+        num_rows="dynamic",
+        use_container_width=True,
+        key=f"portfolio_editor_{st.session_state.get('portfolio_upload')}",
+        column_config={
+            "ticker": st.column_config.TextColumn("Ticker", required=True),
+            "shares": st.column_config.NumberColumn("Shares", min_value=0.0, required=True),
+            "cost": st.column_config.NumberColumn("Cost per Share ($)", min_value=0.0, format="$%.2f", required=True),
+            "date": st.column_config.DateColumn("Date Acquired"),
+        },
+    )
+    period = st.selectbox("Period", ["1mo", "3mo", "6mo", "1y", "2y", "5y", "max"], index=3)
+    
+    with instrumentation.timer("portfolio"):
+        valuation, simulated = portfolio.get_valuation(lots, period)
+    
+    if valuation.positions.empty:
+        st.info("Add a lot above to value your portfolio.")
+    else:
+        if simulated:
+            st.info(f"Using simulated prices for {', '.join(simulated)}. Real-time data is unavailable.")
+        
+        totals = valuation.totals
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Market Value", f"${totals['market_value']:,.2f}")
+        col2.metric("Cost Basis", f"${totals['cost_basis']:,.2f}")
+        col3.metric("Day P&L", f"${totals['day_pnl']:,.2f}",
+                    delta=f"{totals['day_pnl'] / (totals['market_value'] - totals['day_pnl']) * 100:.2f}%"
+                    if totals['market_value'] != totals['day_pnl'] else None)
+        col4.metric("Unrealized P&L", f"${totals['unrealized_pnl']:,.2f}",
+                    delta=f"{totals['unrealized_pct']:.2f}%" if totals['unrealized_pct'] is not None else None)
+        
+        st.subheader("Positions")
+        st.dataframe(
+            valuation.positions.sort_values("market_value", ascending=False),
+            use_container_width=True,
+            column_config={
+                "shares": st.column_config.NumberColumn("Shares", format="%.2f"),
+                "avg_cost": st.column_config.NumberColumn("Avg Cost", format="$%.2f"),
+                "cost_basis": st.column_config.NumberColumn("Cost Basis", format="$%.2f"),
+                "price": st.column_config.NumberColumn("Price", format="$%.2f"),
+                "market_value": st.column_config.NumberColumn("Market Value", format="$%.2f"),
+                "day_pnl": st.column_config.NumberColumn("Day P&L", format="$%.2f"),
+                "unrealized_pnl": st.column_config.NumberColumn("Unrealized P&L", format="$%.2f"),
+                "unrealized_pct": st.column_config.NumberColumn("Unrealized (%)", format="%.2f%%"),
+                "weight": st.column_config.NumberColumn("Weight (%)", format="%.2f%%"),
+            },
+        )
+        
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            st.subheader("Allocation")
+            # The largest positions get their own slice; the rest share one
+            weights = valuation.positions["market_value"].sort_values(ascending=False)
+            weights = weights[weights > 0]
+            if len(weights) > 10:
+                weights = pd.concat([weights[:9], pd.Series({"Other": weights[9:].sum()})])
+            if not weights.empty:
+                show_chart(charts.pie_chart(weights.index, weights))
+        
+        with col2:
+            st.subheader("Equity Curve")
+            show_chart(charts.equity_chart(valuation.curve()))
+
+
 # Personal Finance Calculator page
-elif page == "Personal Finance Calculator":
+def finance_calculator_page():
     st.title("💰 Personal Finance Calculator")
     
     st.subheader("Monthly Budget Calculator")
@@ -654,10 +452,7 @@ elif page == "Personal Finance Calculator":
         expense_df = expense_df[expense_df['Amount'] > 0]  # Only show categories with expenses
         
         if not expense_df.empty:
-            fig, ax = plt.subplots(figsize=(10, 6))
-            ax.pie(expense_df['Amount'], labels=expense_df['Category'], autopct='%1.1f%%')
-            ax.axis('equal')
-            st.pyplot(fig)
+            show_chart(charts.pie_chart(expense_df['Category'], expense_df['Amount']))
         
         # Investment projection
         st.subheader("Investment Projection")
@@ -665,18 +460,42 @@ elif page == "Personal Finance Calculator":
         interest_rate = st.slider("Expected Annual Return (%)", 1.0, 15.0, 7.0)
         
         monthly_investment = savings
-        future_value = 0
-        
-        for month in range(1, years * 12 + 1):
-            future_value = future_value * (1 + interest_rate/100/12) + monthly_investment
+        future_value = finance_calculator.future_value(monthly_investment, interest_rate, years)
         
         st.write(f"If you invest ${monthly_investment:.2f} monthly for {years} years at {interest_rate}% annual return:")
         st.write(f"Projected Future Value: **${future_value:,.2f}**")
         st.write(f"Total Contributions: **${monthly_investment * years * 12:,.2f}**")
         st.write(f"Investment Growth: **${future_value - (monthly_investment * years * 12):,.2f}**")
+        
+        # Scenario grid around the chosen return and timeline, computed in one pass
+        with st.expander("Scenario Grid"):
+            grid_rates = [rate for rate in np.arange(interest_rate - 3, interest_rate + 3.5, 1.0) if rate >= 0]
+            grid_years = sorted({5, 10, 20, 30, 40, years})
+            grid = finance_calculator.future_value_grid(grid_rates, grid_years, [monthly_investment])[:, :, 0]
+            grid_df = pd.DataFrame(
+                grid,
+                index=[f"{rate:.1f}%" for rate in grid_rates],
+                columns=[f"{y} yrs" for y in grid_years]
+            )
+            st.write(f"Projected value of ${monthly_investment:.2f} per month by annual return and timeline:")
+            st.dataframe(grid_df.style.format("${:,.0f}"))
+        
+        # Monte Carlo projection with percentile bands
+        with st.expander("Monte Carlo Simulation"):
+            volatility = st.slider("Annual Volatility (%)", 0.0, 40.0, 15.0)
+            months, bands = finance_calculator.simulate_future_value(
+                monthly_investment, interest_rate, volatility, years
+            )
+            low, lower_mid, median, upper_mid, high = bands
+            
+            st.write(f"Median outcome: **${median[-1]:,.2f}**")
+            st.write(f"90% of simulated outcomes fall between **${low[-1]:,.2f}** and **${high[-1]:,.2f}**")
+            
+            show_chart(charts.projection_chart(months, bands))
+
 
 # Financial News page
-elif page == "Financial News":
+def news_page():
     st.title("📰 Financial News")
     st.write("Stay updated with the latest financial news and market trends.")
     
@@ -684,143 +503,130 @@ elif page == "Financial News":
     query = st.text_input("Search for specific financial news (leave empty for latest news):")
     
     if st.button("Get News") or not query:
-        # Create demo news articles
-        demo_articles = [
-            {
-                "title": "Markets Rally as Fed Signals Potential Rate Cuts",
-                "link": "https://finance.yahoo.com/news/markets-rally-fed-signals-potential-rate-cuts",
-                "source": "Yahoo Finance"
-            },
-            {
-                "title": "Tech Stocks Lead Market Gains Amid AI Optimism",
-                "link": "https://finance.yahoo.com/news/tech-stocks-lead-market-gains-ai-optimism",
-                "source": "Reuters"
-            },
-            {
-                "title": "Oil Prices Stabilize After Recent Volatility",
-                "link": "https://finance.yahoo.com/news/oil-prices-stabilize-recent-volatility",
-                "source": "Bloomberg"
-            },
-            {
-                "title": "Retail Sales Exceed Expectations in Latest Report",
-                "link": "https://finance.yahoo.com/news/retail-sales-exceed-expectations-latest-report",
-                "source": "CNBC"
-            },
-            {
-                "title": "Housing Market Shows Signs of Cooling as Mortgage Rates Rise",
-                "link": "https://finance.yahoo.com/news/housing-market-shows-signs-cooling-mortgage-rates-rise",
-                "source": "Wall Street Journal"
-            }
-        ]
-        
-        # Add search-specific articles if query is provided
-        if query:
-            # Create some demo articles related to the search query
-            search_term = query.lower()
-            
-            if "crypto" in search_term or "bitcoin" in search_term:
-                crypto_articles = [
-                    {
-                        "title": f"Bitcoin Surges Past $60,000 Amid Growing Institutional Interest",
-                        "link": "https://finance.yahoo.com/news/bitcoin-surges-past-60000",
-                        "source": "CoinDesk"
-                    },
-                    {
-                        "title": f"Cryptocurrency Market Cap Exceeds $2 Trillion as Adoption Grows",
-                        "link": "https://finance.yahoo.com/news/crypto-market-cap-exceeds-2-trillion",
-                        "source": "Bloomberg"
-                    },
-                    {
-                        "title": f"Regulators Consider New Framework for Cryptocurrency Oversight",
-                        "link": "https://finance.yahoo.com/news/regulators-consider-new-framework-crypto",
-                        "source": "Wall Street Journal"
-                    }
-                ]
-                demo_articles = crypto_articles + demo_articles[:2]
-            
-            elif "stock" in search_term or "market" in search_term:
-                stock_articles = [
-                    {
-                        "title": f"Stock Market Outlook: Analysts Predict Continued Growth Through Q4",
-                        "link": "https://finance.yahoo.com/news/stock-market-outlook-q4",
-                        "source": "Barron's"
-                    },
-                    {
-                        "title": f"Market Volatility Increases as Earnings Season Approaches",
-                        "link": "https://finance.yahoo.com/news/market-volatility-increases",
-                        "source": "CNBC"
-                    },
-                    {
-                        "title": f"Small-Cap Stocks Outperform as Economic Recovery Accelerates",
-                        "link": "https://finance.yahoo.com/news/small-cap-stocks-outperform",
-                        "source": "Motley Fool"
-                    }
-                ]
-                demo_articles = stock_articles + demo_articles[:2]
-            
-            else:
-                # Generic search results with the query term included
-                custom_articles = [
-                    {
-                        "title": f"Latest Developments in {query.title()} Market Show Promising Trends",
-                        "link": f"https://finance.yahoo.com/news/{query.lower().replace(' ', '-')}-market-trends",
-                        "source": "Yahoo Finance"
-                    },
-                    {
-                        "title": f"Investors Eye {query.title()} Sector for Growth Opportunities",
-                        "link": f"https://finance.yahoo.com/news/investors-eye-{query.lower().replace(' ', '-')}-sector",
-                        "source": "Reuters"
-                    },
-                    {
-                        "title": f"Analysis: How {query.title()} Is Reshaping the Financial Landscape",
-                        "link": f"https://finance.yahoo.com/news/analysis-{query.lower().replace(' ', '-')}-reshaping-finance",
-                        "source": "Bloomberg"
-                    }
-                ]
-                demo_articles = custom_articles + demo_articles[:2]
-        
-        st.info("Displaying demo financial news articles. Live data connection is currently unavailable.")
+        # Articles are scraped by a background refresher and shared by every session
+        refresher = news_refresher.start_refresher()
+        if news_refresher.store.record_query(query):
+            refresher.request_refresh()
+        articles, fetched_at = news_refresher.store.get(query)
+        
+        if articles:
+            st.caption(f"Last refreshed {int(time.time() - fetched_at)} seconds ago")
+        elif news_refresher.store.is_pending(query):
+            # Queued for the refresher, which fetches new queries right away
+            articles = []
+            st.info("Refreshing… the latest articles will appear in a moment. Click \"Get News\" to check again.")
+        else:
+            articles = news.demo_articles(query)
+            st.info("Displaying demo financial news articles. Live data connection is currently unavailable.")
         
         # Display the articles
-        st.success(f"Found {len(demo_articles)} articles" + (f" about '{query}'" if query else ""))
+        if articles:
+            st.success(f"Found {len(articles)} articles" + (f" about '{query}'" if query else ""))
         
         # Display each article with a clickable link
-        for i, article in enumerate(demo_articles, 1):
+        for i, article in enumerate(articles, 1):
             with st.container():
                 st.subheader(f"{i}. {article['title']}")
                 st.write(f"**Source:** {article.get('source', 'Yahoo Finance')}")
                 st.markdown(f"[Read full article]({article['link']})")
                 st.divider()
 
+
 # Chat Assistant page
-elif page == "Chat Assistant":
+def chat_page():
     st.title("💬 Chat Assistant")
     st.write("Ask me anything about stocks, personal finance, or financial news.")
     
-    # Initialize chat history
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
+    # Initialize chat history: a bounded in-memory window, older turns spilled to disk
+    if "chat_history" not in st.session_state:
+        st.session_state.chat_history = ChatHistory(uuid.uuid4().hex)
+        st.session_state.earlier_shown = 0
+    history = st.session_state.chat_history
+    
+    # Page through earlier messages on request instead of re-rendering everything
+    if history.spilled:
+        if st.session_state.earlier_shown < history.spilled and st.button("Load earlier messages"):
+            st.session_state.earlier_shown = min(st.session_state.earlier_shown + CHAT_PAGE_SIZE, history.spilled)
+        if st.session_state.earlier_shown:
+            st.caption(f"Showing {st.session_state.earlier_shown} of {history.spilled} earlier messages")
     
     # Display chat history
-    for message in st.session_state.messages:
+    for message in history.earlier(st.session_state.earlier_shown) + list(history.recent):
         with st.chat_message(message["role"]):
             st.markdown(message["content"])
     
     # Accept user input
     if prompt := st.chat_input("Ask a question..."):
         # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": prompt})
+        history.append("user", prompt)
         
         # Display user message
         with st.chat_message("user"):
             st.markdown(prompt)
         
         # Generate response
-        response = generate_response(prompt)
+        with instrumentation.timer("chat.route"):
+            response = generate_response(prompt)
         
         # Display assistant response
         with st.chat_message("assistant"):
             st.markdown(response)
         
         # Add assistant response to chat history
-        st.session_state.messages.append({"role": "assistant", "content": response})
+        history.append("assistant", response)
+
+
+# Admin panel with per-stage timings, shown when ADMIN_PANEL=1
+def admin_panel():
+    with st.sidebar.expander("Admin: performance"):
+        stats = instrumentation.snapshot()
+        if stats:
+            st.dataframe(pd.DataFrame(stats).T.round(2), use_container_width=True)
+        else:
+            st.caption("No timings recorded yet.")
+        st.checkbox("Profile each rerun with cProfile", value=instrumentation.PROFILE_RERUNS, key="profile_reruns",
+                    help=f"Writes a .prof file per rerun to {instrumentation.PROFILE_DIR}/")
+        if st.session_state.get("last_profile"):
+            st.caption(f"Last profile: {st.session_state.last_profile}")
+        if st.button("Reset timings"):
+            instrumentation.reset()
+        st.download_button("Download metrics (Prometheus text)", instrumentation.prometheus_text(),
+                           file_name="metrics.txt")
+    
+    with st.sidebar.expander("Admin: news refresher"):
+        news_status = news_refresher.store.status()
+        if news_status["stale"]:
+            st.warning("News store is stale" + (" (never refreshed)" if news_status["last_refresh"] is None else ""))
+        if news_status["age_seconds"] is not None:
+            st.caption(f"Last full refresh {int(news_status['age_seconds'])} seconds ago")
+        if news_status["last_error"]:
+            st.caption(f"Last error: {news_status['last_error']}")
+        st.json(news_status)
+
+
+PAGES = {
+    "Home": home_page,
+    "Stock Lookup": stock_lookup_page,
+    "Stock Screener": stock_screener_page,
+    "Portfolio": portfolio_page,
+    "Personal Finance Calculator": finance_calculator_page,
+    "Financial News": news_page,
+    "Chat Assistant": chat_page,
+}
+
+
+def render_page(page):
+    PAGES[page]()
+    if os.environ.get("ADMIN_PANEL") == "1":
+        admin_panel()
+
+
+# The page runs in try/finally, so the rerun is always timed and the profiler always
+# stopped, even when the page raises or calls st.experimental_rerun()
+try:
+    render_page(page)
+finally:
+    instrumentation.observe(f"rerun.{page}", time.perf_counter() - rerun_started)
+    profile_path = instrumentation.stop_profile(profiler)
+    if profile_path:
+        st.session_state.last_profile = profile_path
@@ -0,0 +1,75 @@
+"""
+Parse time per page for news.parse_articles against the saved Yahoo Finance fixtures.
+
+Compares the original whole-page parse with the strained parse, for every available parser:
+
+    python benchmarks/bench_news_parsing.py
+"""
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import news  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+PAGES = ["yahoo_front.html", "yahoo_search.html"]
+
+
+def legacy_parse(html, base_url=news.BASE_URL):
+    """The parser as it was before the strained version, kept as the baseline."""
+    soup = BeautifulSoup(html, 'html.parser')
+    articles = []
+    news_items = soup.select('li.js-stream-content, div.Ov\\(h\\), div.Cf')
+    if not news_items:
+        news_items = soup.select('div.NewsArticle, div.StretchedBox')
+    if not news_items:
+        for div in soup.find_all('div', class_=True):
+            if div.find('a') and (div.find('h3') or div.find('h4')):
+                news_items.append(div)
+    for item in news_items[:10]:
+        title_tag = item.select_one('h3, h4, a.js-content-viewer')
+        link_tag = item.select_one('a[href]')
+        if title_tag and link_tag:
+            title = title_tag.text.strip()
+            link = link_tag.get('href')
+            if link.startswith('/'):
+                link = base_url + link
+            source_tag = item.select_one('span.provider-name')
+            source = source_tag.text.strip() if source_tag else "Yahoo Finance"
+            if title and not any(a.get('title') == title for a in articles):
+                articles.append({'title': title, 'link': link, 'source': source})
+    return articles
+
+
+def time_call(func, *args, repeat=20):
+    """Median wall time of ``func(*args)`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(repeat=20):
+    parsers = ["html.parser"] + (["lxml"] if news.PARSER == "lxml" else [])
+    results = []
+    for page in PAGES:
+        html = (FIXTURES / page).read_bytes()
+        results.append((page, "legacy (html.parser)", time_call(legacy_parse, html, repeat=repeat)))
+        for parser in parsers:
+            news.PARSER = parser
+            results.append((page, f"strained ({parser})", time_call(news.parse_articles, html, repeat=repeat)))
+    news.PARSER = parsers[-1]
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'page':<20} {'variant':<24} {'ms/page':>10}")
+    for page, variant, ms in run():
+        print(f"{page:<20} {variant:<24} {ms:>10.2f}")
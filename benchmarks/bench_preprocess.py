@@ -0,0 +1,80 @@
+"""
+Per-message latency of the console chatbot's text preprocessing, before and after
+hoisting the stoplist/lemmatizer/regexes into TextPreprocessor:
+
+    python benchmarks/bench_preprocess.py
+"""
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from string import punctuation
+
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+from nltk.tokenize import word_tokenize
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from text_preprocessor import TextPreprocessor  # noqa: E402
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+
+def load_questions():
+    return [line.strip() for line in (FIXTURES / "questions.txt").read_text().splitlines() if line.strip()]
+
+
+def legacy_preprocess(text):
+    """main.preprocess_text as it was before TextPreprocessor, kept as the baseline."""
+    text = re.sub(r'[^a-zA-Z]', ' ', text)
+    text = re.sub(r'\[.*?\]', ' ', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    stoplist = set(stopwords.words('english') + list(punctuation))
+    tokens = word_tokenize(text.lower())
+    filtered_tokens = [word for word in tokens if word.isalnum() and word not in stoplist]
+    lemmatizer = WordNetLemmatizer()
+    filtered_tokens = [lemmatizer.lemmatize(word) for word in filtered_tokens]
+    return ' '.join(filtered_tokens)
+
+
+def per_message_us(func, questions, rounds=20):
+    """Median microseconds per message over ``rounds`` passes of the corpus."""
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for question in questions:
+            func(question)
+        samples.append((time.perf_counter() - start) / len(questions) * 1e6)
+    return statistics.median(samples)
+
+
+def batch_us(func, questions, rounds=20):
+    """Median microseconds per message when the whole corpus is passed as one batch."""
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(questions)
+        samples.append((time.perf_counter() - start) / len(questions) * 1e6)
+    return statistics.median(samples)
+
+
+def run(rounds=20):
+    questions = load_questions()
+    preprocessor = TextPreprocessor()
+
+    # Same output, so the comparison is like for like
+    assert [legacy_preprocess(q) for q in questions] == preprocessor.preprocess_many(questions)
+
+    return [
+        ("legacy preprocess_text", per_message_us(legacy_preprocess, questions, rounds)),
+        ("TextPreprocessor.preprocess", per_message_us(preprocessor.preprocess, questions, rounds)),
+        ("TextPreprocessor.preprocess_many", batch_us(preprocessor.preprocess_many, questions, rounds)),
+    ]
+
+
+if __name__ == "__main__":
+    print(f"{'variant':<34} {'us/message':>12}")
+    for variant, us in run():
+        print(f"{variant:<34} {us:>12.1f}")
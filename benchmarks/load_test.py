@@ -0,0 +1,246 @@
+"""
+Multi-session load test for app.py. Every simulated session walks through the Home, Stock
+Lookup, Personal Finance Calculator, Financial News and Chat Assistant pages with Streamlit's
+AppTest, all inside this one process, the way a single `streamlit run app.py` serves its users.
+
+Yahoo Finance is replaced by local stand-ins: an HTTP server that serves the saved pages in
+benchmarks/fixtures, and a yfinance stand-in that returns synthetic data after a configurable
+delay, so runs are repeatable and never touch the network.
+
+    python benchmarks/load_test.py                              # 1, 2, 4 and 8 concurrent sessions
+    python benchmarks/load_test.py -c 1 -c 16 --rounds 3 --latency 0.2 --json load.json
+
+For each concurrency level it reports reruns/second, p50/p95/p99 rerun latency and how much
+the process's resident memory grew.
+"""
+import argparse
+import gc
+import http.server
+import json
+import os
+import random
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = ROOT / "benchmarks" / "fixtures"
+APP = ROOT / "app.py"
+sys.path.insert(0, str(ROOT))
+
+# Demo tickers are served locally by market_data; the others go through the yfinance stand-in
+TICKERS = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "NVDA", "META", "JPM", "XOM", "KO"]
+PERIODS = ["1mo", "3mo", "6mo", "1y", "2y", "5y", "max"]
+NEWS_QUERIES = ["apple", "interest rates", "oil", "crypto", "earnings"]
+CHAT_MESSAGES = ["What stock should I buy?", "How do I start budgeting?", "Tell me about AAPL",
+                 "What is a good savings rate?", "hello"]
+
+
+def start_news_server(latency=0.0):
+    """Serve the saved Yahoo Finance pages on a local port; returns its base URL."""
+    pages = {"/": (FIXTURES / "yahoo_front.html").read_bytes(),
+             "/search": (FIXTURES / "yahoo_search.html").read_bytes()}
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            body = pages.get(self.path.split("?", 1)[0], pages["/"])
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def yfinance_stand_in(latency=0.0):
+    """Object with the parts of the yfinance module that market_data uses, backed by synthetic data."""
+    from synthetic_data import generate_history
+
+    class Ticker:
+        def __init__(self, ticker):
+            self.ticker = ticker
+
+        @property
+        def info(self):
+            time.sleep(latency)
+            price = 50 + sum(map(ord, self.ticker)) % 400
+            return {"longName": f"{self.ticker} Corp.", "regularMarketPrice": price, "previousClose": price * 0.99,
+                    "sector": "Technology", "trailingPE": 20.0, "dividendYield": 0.01, "marketCap": price * 1e9,
+                    "longBusinessSummary": f"Stand-in data for {self.ticker}."}
+
+        def history(self, period="1mo"):
+            time.sleep(latency)
+            return generate_history(self.ticker, period)
+
+    def download(tickers, period="1mo", **kwargs):
+        raise RuntimeError("bulk download is not used by app.py")
+
+    return SimpleNamespace(Ticker=Ticker, download=download)
+
+
+def share_runtime():
+    """
+    Give every AppTest session the process-wide state a real server shares between sessions.
+
+    AppTest installs and removes a mock Runtime singleton around every run, so sessions in
+    different threads would tear down each other's runtime mid-script; it also compiles the
+    script into a fresh cache on every run, and concurrent compiles of the same file can fail
+    on CPython 3.11. A server has one runtime and one script cache, so install those instead.
+    """
+    from unittest.mock import MagicMock
+
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import local_script_runner
+
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+
+    script_cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: script_cache
+
+
+def rss_mb():
+    """Current resident memory of this process (peak on platforms without /proc)."""
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except OSError:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def session(rng, timeout=60):
+    """One user's visit to every page; returns (rerun latencies in seconds, errors)."""
+    from streamlit.testing.v1 import AppTest
+
+    latencies, errors = [], []
+    at = AppTest.from_file(str(APP), default_timeout=timeout)
+
+    def step(action):
+        start = time.perf_counter()
+        action()
+        latencies.append(time.perf_counter() - start)
+        errors.extend(exception.message for exception in at.exception)
+
+    def widget(elements, label):
+        return next(element for element in elements if element.label == label)
+
+    def go(page):
+        step(lambda: at.sidebar.selectbox[0].select(page).run())
+
+    ticker = rng.choice(TICKERS)
+    try:
+        step(at.run)
+        step(lambda: at.text_input[0].input(ticker).run())
+
+        go("Stock Lookup")
+        step(lambda: at.text_input[0].input(ticker).run())
+        step(lambda: widget(at.selectbox, "Period").select(rng.choice(PERIODS)).run())
+
+        go("Personal Finance Calculator")
+        step(lambda: widget(at.number_input, "Monthly Income ($)").set_value(rng.randrange(3000, 9000, 100)).run())
+        step(lambda: widget(at.number_input, "Housing/Rent ($)").set_value(rng.randrange(800, 2500, 50)).run())
+
+        go("Financial News")
+        step(lambda: at.text_input[0].input(rng.choice(NEWS_QUERIES)).run())
+        step(lambda: widget(at.button, "Get News").click().run())
+
+        go("Chat Assistant")
+        for message in rng.sample(CHAT_MESSAGES, 2):
+            step(lambda message=message: at.chat_input[0].set_value(message).run())
+    except Exception as e:
+        # A rerun that timed out or rendered without the expected widgets ends the session
+        errors.append(f"{type(e).__name__}: {e}")
+
+    return latencies, errors
+
+
+def run_level(concurrency, rounds, seed=0):
+    """``concurrency`` sessions at a time, ``concurrency * rounds`` sessions in total."""
+    gc.collect()
+    rss_before = rss_mb()
+    seeds = [seed * 100003 + index for index in range(concurrency * rounds)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda session_seed: session(random.Random(session_seed)), seeds))
+    elapsed = time.perf_counter() - start
+
+    gc.collect()
+    latencies = np.array([latency for session_latencies, _ in results for latency in session_latencies]) * 1000
+    errors = [error for _, session_errors in results for error in session_errors]
+    return {
+        "concurrency": concurrency,
+        "sessions": len(seeds),
+        "reruns": len(latencies),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:5],
+        "elapsed_s": elapsed,
+        "reruns_per_s": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p95_ms": float(np.percentile(latencies, 95)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "rss_mb": rss_mb(),
+        "rss_growth_mb": rss_mb() - rss_before,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test app.py with many simulated sessions")
+    parser.add_argument("-c", "--concurrency", type=int, action="append",
+                        help="concurrent sessions (repeatable, default 1 2 4 8)")
+    parser.add_argument("--rounds", type=int, default=2, help="sessions per concurrent slot (default 2)")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="seconds the Yahoo/yfinance stand-ins take per request (default 0.05)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    # Point the app at the stand-ins before it (or the news module) is imported
+    os.environ["YAHOO_FINANCE_URL"] = start_news_server(args.latency)
+    import market_data
+    market_data.yf = yfinance_stand_in(args.latency)
+    share_runtime()
+
+    # A first session outside the measurements pays for imports and warms the caches
+    session(random.Random(-1))
+
+    print(f"{'sessions':>9} {'concurrent':>10} {'reruns':>7} {'reruns/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'RSS MB':>8} {'growth':>7} {'errors':>6}")
+    results = []
+    for concurrency in args.concurrency or [1, 2, 4, 8]:
+        result = run_level(concurrency, args.rounds, args.seed)
+        results.append(result)
+        print(f"{result['sessions']:>9} {concurrency:>10} {result['reruns']:>7} {result['reruns_per_s']:>9.1f} "
+              f"{result['p50_ms']:>8.1f} {result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} "
+              f"{result['rss_mb']:>8.1f} {result['rss_growth_mb']:>+7.1f} {result['errors']:>6}")
+        for error in result["error_samples"]:
+            print(f"    error: {error}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({"latency_s": args.latency, "rounds": args.rounds,
+                                               "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
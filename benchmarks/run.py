@@ -0,0 +1,263 @@
+"""
+Offline benchmark suite for the project's hot paths. Every case runs on fixtures or
+seeded synthetic data, so results are reproducible without the network.
+
+    python benchmarks/run.py                          # run everything, save JSON to benchmarks/results/
+    python benchmarks/run.py -k news -k finance       # only cases whose name contains "news" or "finance"
+    python benchmarks/run.py --compare benchmarks/results/<earlier run>.json
+
+Results are median/min/mean microseconds per call; --compare flags cases that got slower
+than --threshold times the earlier median.
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import setup_nltk  # noqa: E402
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+STOCK_PERIODS = ["1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "max"]
+
+
+class Skip(Exception):
+    """A case that can't run here, e.g. because NLTK data is missing."""
+
+
+def measure(func, repeat=20, number=1, setup=None):
+    """Microseconds per call of ``func()``: ``repeat`` samples of ``number`` calls each."""
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+    return {
+        "median_us": statistics.median(samples),
+        "min_us": min(samples),
+        "mean_us": statistics.fmean(samples),
+        "stdev_us": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def load_questions():
+    path = ROOT / "benchmarks" / "fixtures" / "questions.txt"
+    return [line.strip() for line in path.read_text().splitlines() if line.strip()]
+
+
+def require_nltk():
+    missing = setup_nltk.missing_resources()
+    if missing:
+        raise Skip(f"NLTK data missing: {', '.join(missing)} (run python setup_nltk.py)")
+
+
+# Each case yields (name, func, options); options are passed on to measure()
+
+def stock_data_cases():
+    import market_data
+
+    for period in STOCK_PERIODS:
+        # Cold: the synthetic history is generated on every call
+        yield (f"stock_data.demo.{period}.cold", lambda period=period: market_data.get_stock_data("AAPL", period),
+               {"setup": market_data.clear_cache})
+    market_data.get_stock_data("AAPL", "1y")
+    yield "stock_data.demo.1y.cached", lambda: market_data.get_stock_data("AAPL", "1y"), {"number": 1000}
+
+    # Replay reads from a store recorded here from synthetic data
+    import tempfile
+    import data_store
+    import synthetic_data
+
+    store = data_store.DataStore(tempfile.mkdtemp(prefix="bench_store_"))
+    store.save_info("NVDA", market_data.demo_info("AAPL"))
+    for period in ("1mo", "5y"):
+        store.save_history("NVDA", period, synthetic_data.generate_history("NVDA", period))
+        yield f"data_store.load_history.{period}", lambda period=period: store.load_history("NVDA", period), {}
+    yield "data_store.load_info", lambda: store.load_info("NVDA"), {"number": 100}
+
+
+def news_cases():
+    import news
+    from bench_news_parsing import FIXTURES, PAGES
+
+    for page in PAGES:
+        html = (FIXTURES / page).read_bytes()
+        yield f"news.parse_articles.{page}", lambda html=html: news.parse_articles(html), {}
+
+
+def chat_cases():
+    from chat_assistant import generate_response
+
+    questions = load_questions()
+    random.seed(0)
+    yield ("chat.app_generate_response.corpus", lambda: [generate_response(q) for q in questions],
+           {"number": 50})
+
+
+def console_chat_cases():
+    require_nltk()
+    import main
+
+    questions = load_questions()
+    main.load_models()
+    # Intent matching is main.generate_response's hot path; the function intents would call
+    # into helper modules that aren't part of this repository
+    yield "chat.main_intent_match.corpus", lambda: [main.intent_index.match(q) for q in questions], {}
+    yield "preprocess.preprocess_text.corpus", lambda: [main.preprocess_text(q) for q in questions], {}
+
+    from text_preprocessor import TextPreprocessor
+    yield ("preprocess.preprocess_many.corpus.uncached",
+           lambda: TextPreprocessor().preprocess_many(questions), {})
+
+
+def finance_cases():
+    import finance_calculator
+
+    yield "finance.future_value", lambda: finance_calculator.future_value(500, 7, 30), {"number": 1000}
+    rates, years, amounts = np.arange(0, 15.5, 0.5), np.arange(1, 41), np.arange(100, 2100, 100)
+    yield "finance.future_value_grid.31x40x20", lambda: finance_calculator.future_value_grid(rates, years, amounts), {}
+    yield ("finance.simulate_future_value.2000x30y",
+           lambda: finance_calculator.simulate_future_value(500, 7, 15, 30), {"repeat": 10})
+
+
+def analysis_cases():
+    import indicators
+    import synthetic_data
+    import valuation_template
+
+    hist = synthetic_data.generate_history("AAPL", "5y", last_price=150)
+    yield "indicators.compute_indicators.5y", lambda: indicators.compute_indicators(hist), {}
+
+    import universe
+
+    # A US-listing-sized universe with some missing P/E ratios
+    size = 8000
+    rng = np.random.default_rng(0)
+    table = universe.normalize(pd.DataFrame({
+        "ticker": [f"T{index:04d}" for index in range(size)],
+        "sector": rng.choice(["Technology", "Energy", "Healthcare", "Utilities", "Financial Services"], size),
+        "price": rng.uniform(1, 500, size),
+        "change": rng.normal(0, 2, size),
+        "market_cap": rng.lognormal(21, 2, size),
+        "pe_ratio": np.where(rng.random(size) < 0.2, np.nan, rng.uniform(3, 80, size)),
+        "dividend_yield": rng.uniform(0, 6, size),
+    }))
+    yield ("universe.screen.8000", lambda: universe.screen(table, sectors=["Technology", "Energy"], min_pe=5, max_pe=25,
+                                                           min_dividend_yield=1, min_market_cap=1e9), {"number": 20})
+
+    import portfolio
+
+    # 600 lots in 300 tickers over a year of bars, then the same with the last bar revised
+    dates = pd.date_range("2024-01-01", periods=252, freq="B")
+    prices = pd.DataFrame(rng.lognormal(4, 0.5, 300) * np.exp(np.cumsum(rng.normal(0, 0.01, (252, 300)), axis=0)),
+                          index=dates, columns=[f"T{index:04d}" for index in range(300)])
+    lots = portfolio.make_lots({"ticker": rng.choice(prices.columns, 600), "shares": rng.integers(1, 100, 600),
+                                "cost": rng.uniform(10, 200, 600), "date": rng.choice(dates, 600)})
+    previous = portfolio.value_portfolio(lots, prices)
+    revised = prices.copy()
+    revised.iloc[-1] *= 1.001
+    yield "portfolio.value_portfolio.300x252", lambda: portfolio.value_portfolio(lots, revised), {}
+    yield ("portfolio.extend_valuation.300x252.last_bar",
+           lambda: portfolio.extend_valuation(lots, revised, previous, portfolio._reusable_rows(prices, revised)), {})
+
+    template = valuation_template.load_template()
+    rng = np.random.default_rng(0)
+    frame = {"EPS": rng.uniform(1, 10, 1000), "BVPS": rng.uniform(10, 100, 1000)}
+    yield "valuation.evaluate.1000", lambda: template.evaluate(frame), {}
+
+
+CASE_GROUPS = [stock_data_cases, news_cases, chat_cases, console_chat_cases, finance_cases, analysis_cases]
+
+
+def run(patterns=(), repeat=None):
+    results = {}
+    for group in CASE_GROUPS:
+        try:
+            for name, func, options in group():
+                if patterns and not any(pattern in name for pattern in patterns):
+                    continue
+                if repeat:
+                    options = {**options, "repeat": repeat}
+                results[name] = measure(func, **options)
+                print(f"{name:<48} {results[name]['median_us']:>14,.1f} us")
+        except Skip as e:
+            results[group.__name__] = {"skipped": str(e)}
+            print(f"{group.__name__:<48} skipped: {e}")
+    return results
+
+
+def metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print median changes against an earlier results file; returns the regressed cases."""
+    regressions = []
+    print(f"\n{'case':<48} {'before us':>12} {'after us':>12} {'ratio':>7}")
+    for name, result in results.items():
+        before = baseline["results"].get(name, {})
+        if "median_us" not in result or "median_us" not in before:
+            continue
+        ratio = result["median_us"] / before["median_us"]
+        flag = "  slower" if ratio > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<48} {before['median_us']:>12,.1f} {result['median_us']:>12,.1f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite")
+    parser.add_argument("-k", dest="patterns", action="append", default=[],
+                        help="only run cases whose name contains this text (repeatable)")
+    parser.add_argument("--repeat", type=int, help="samples per case (default depends on the case)")
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<time>_<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="ratio above which a case counts as a regression (default 1.2)")
+    args = parser.parse_args(argv)
+
+    report = {**metadata(), "results": run(args.patterns, args.repeat)}
+
+    output = Path(args.output) if args.output else RESULTS_DIR / (
+        datetime.now().strftime("%Y%m%d-%H%M%S") + f"_{(report['commit'] or 'nogit')[:8]}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nSaved {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if compare(report["results"], baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import hashlib
+import io
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+
+from downsampling import CHART_MAX_POINTS, downsample
+from instrumentation import timer
+from ttl_cache import TTLCache
+
+# Rendered images are cached by (ticker, period, chart kind, data fingerprint)
+CHART_CACHE_SIZE = int(os.environ.get("CHART_CACHE_SIZE", 128))
+CHART_CACHE_TTL = float(os.environ.get("CHART_CACHE_TTL", 600))
+
+chart_cache = TTLCache(maxsize=CHART_CACHE_SIZE, ttl=CHART_CACHE_TTL)
+
+_render_lock = threading.Lock()
+_render_stats = {"renders": 0, "render_seconds": 0.0, "last_render_ms": None}
+
+
+def fingerprint(data):
+    """Short digest of a DataFrame, Series or array, so changed data never hits a stale image."""
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        raw = pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes()
+    else:
+        raw = np.ascontiguousarray(data).tobytes()
+    return hashlib.blake2b(raw, digest_size=12).hexdigest()
+
+
+def render(key, draw, figsize=(10, 6), fmt="png"):
+    """
+    Return the image bytes for ``key``, calling ``draw(ax)`` only on a cache miss.
+
+    Figures are created with the object-oriented API rather than pyplot, so they never
+    enter pyplot's global registry and are freed as soon as the bytes are written.
+    """
+    image = chart_cache.get(key)
+    if image is not None:
+        return image
+
+    start = time.perf_counter()
+    with timer("chart.draw"):
+        fig = Figure(figsize=figsize)
+        draw(fig.subplots())
+    with timer("chart.encode"):
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt)
+    image = buffer.getvalue()
+    elapsed = time.perf_counter() - start
+
+    with _render_lock:
+        _render_stats["renders"] += 1
+        _render_stats["render_seconds"] += elapsed
+        _render_stats["last_render_ms"] = elapsed * 1000
+
+    chart_cache.set(key, image)
+    return image
+
+
+def chart_stats():
+    """Cache hits/misses plus how many charts were rendered and how long that took."""
+    with _render_lock:
+        stats = dict(_render_stats)
+    stats["cache"] = chart_cache.stats()
+    return stats
+
+
+def price_chart(ticker, period, hist, title=None, kind="price", figsize=(10, 6), labels=True,
+                max_points=CHART_MAX_POINTS):
+    """Line chart of ``hist['Close']``, downsampled to at most ``max_points`` points."""
+    close = hist['Close']
+    key = (ticker, period, f"{kind}:{max_points}", fingerprint(close))
+
+    def draw(ax):
+        # Only runs on a cache miss, so long histories are downsampled just once
+        points = downsample(close, max_points)
+        ax.plot(points.index, points)
+        ax.set_title(title or f"{ticker} Stock Price")
+        if labels:
+            ax.set_xlabel("Date")
+            ax.set_ylabel("Price ($)")
+        ax.grid(True)
+
+    return render(key, draw, figsize)
+
+
+def pie_chart(labels, values, figsize=(10, 6)):
+    """Pie chart with percentage labels, e.g. the expense breakdown."""
+    labels, values = list(labels), np.asarray(values, dtype=float)
+
+    def draw(ax):
+        ax.pie(values, labels=labels, autopct='%1.1f%%')
+        ax.axis('equal')
+
+    return render((None, None, "pie", fingerprint(values) + "|".join(labels)), draw, figsize)
+
+
+def projection_chart(months, bands, figsize=(10, 5)):
+    """Monte Carlo percentile bands from finance_calculator.simulate_future_value."""
+    years = np.asarray(months) / 12
+    low, lower_mid, median, upper_mid, high = bands
+
+    def draw(ax):
+        ax.fill_between(years, low, high, alpha=0.2, label="5th-95th percentile")
+        ax.fill_between(years, lower_mid, upper_mid, alpha=0.4, label="25th-75th percentile")
+        ax.plot(years, median, label="Median")
+        ax.set_xlabel("Years")
+        ax.set_ylabel("Portfolio Value ($)")
+        ax.legend()
+        ax.grid(True)
+
+    return render((None, None, "projection", fingerprint(bands)), draw, figsize)
+
+
+def equity_chart(curve, figsize=(10, 5), max_points=CHART_MAX_POINTS):
+    """Portfolio value against cost basis over time, from portfolio.Valuation.curve()."""
+    curve = curve[["Value", "Cost Basis"]]
+
+    def draw(ax):
+        for column in curve.columns:
+            points = downsample(curve[column], max_points)
+            ax.plot(points.index, points, label=column)
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Value ($)")
+        ax.legend()
+        ax.grid(True)
+
+    return render((None, None, f"equity:{max_points}", fingerprint(curve)), draw, figsize)
@@ -0,0 +1,91 @@
+import random
+
+from keyword_router import KeywordRouter
+
+# Common stock tickers, answered when the whole message is a ticker
+STOCK_TICKERS = {
+    "aapl": "Apple Inc. (AAPL)",
+    "msft": "Microsoft Corporation (MSFT)",
+    "googl": "Alphabet Inc. (GOOGL)",
+    "amzn": "Amazon.com Inc. (AMZN)",
+    "tsla": "Tesla Inc. (TSLA)",
+    "meta": "Meta Platforms Inc. (META)",
+    "nvda": "NVIDIA Corporation (NVDA)",
+    "nflx": "Netflix Inc. (NFLX)"
+}
+
+# Dictionary of predefined responses for different types of queries, in priority order
+RESPONSES = {
+    "stock": [
+        "To get stock information, go to the Stock Information page and enter a ticker symbol.",
+        "I can help you find stock data. Try checking the Stock Information page and entering a ticker like 'AAPL' or 'MSFT'.",
+        "Looking for stock data? Head to the Stock Information page and enter the ticker symbol you're interested in."
+    ],
+    "finance": [
+        "For personal finance calculations, visit the Personal Finance page to track expenses and calculate savings.",
+        "Need help with personal finance? Check out the Personal Finance page to manage your expenses and savings.",
+        "Our Personal Finance tool can help you track expenses and calculate potential savings."
+    ],
+    "news": [
+        "For the latest financial news, visit the Financial News page.",
+        "Stay updated with financial news on our Financial News page. You can also search for specific topics.",
+        "Check out the Financial News page for the latest updates on financial markets and trends."
+    ],
+    "hello": [
+        "Hello! How can I help you with your financial questions today?",
+        "Hi there! I'm your financial assistant. What would you like to know?",
+        "Greetings! I'm here to help with your financial queries."
+    ],
+    "help": [
+        "I can help you with stock information, personal finance calculations, and financial news. What would you like to know?",
+        "Need help? You can ask me about stocks, personal finance, or financial news.",
+        "I'm here to assist with your financial questions. Try asking about stocks, personal finance, or the latest news."
+    ],
+    "price": [
+        "To check stock prices, go to the Stock Lookup page and enter a ticker symbol.",
+        "You can find current stock prices on the Stock Lookup page. Just enter the ticker symbol you're interested in.",
+        "Looking for stock prices? Head to the Stock Lookup page and enter a ticker like 'AAPL' or 'MSFT'."
+    ],
+    "invest": [
+        "For investment information, check out our Stock Lookup page for current data and trends.",
+        "Interested in investing? Our Stock Lookup page provides key metrics and price history for various stocks.",
+        "Investment decisions should be based on thorough research. Our Stock Lookup page can help you get started with data."
+    ],
+    "budget": [
+        "Need help with budgeting? Visit our Personal Finance page to track expenses and calculate savings.",
+        "Budgeting is essential for financial health. Try our Personal Finance calculator to help manage your expenses.",
+        "Our Personal Finance page can help you create a budget by tracking your income and expenses."
+    ],
+    "market": [
+        "For market updates, check our Financial News page for the latest trends and information.",
+        "Stay informed about market movements with our Financial News section.",
+        "The market is always changing. Visit our Financial News page to stay updated."
+    ]
+}
+
+# Default responses if no keywords match
+DEFAULT_RESPONSES = [
+    "I'm your financial assistant. Try asking about stocks, personal finance, or financial news.",
+    "I can help with questions about stocks, personal finance, and financial news. What would you like to know?",
+    "Not sure what you're asking. I can provide information about stocks, personal finance, and financial news.",
+    "Try asking me about specific financial topics like stock prices, budgeting, or market news."
+]
+
+# Built once at import; Streamlit reruns reuse it
+router = KeywordRouter(RESPONSES)
+
+
+def generate_response(user_input):
+    """Generate a response based on the user's input"""
+    user_input = user_input.lower().strip()
+
+    # Check if input is a stock ticker
+    if user_input in STOCK_TICKERS:
+        return f"Looking for information about {STOCK_TICKERS[user_input]}? Head to the Stock Lookup page and enter '{user_input.upper()}' to see current price, charts, and key metrics."
+
+    # Whole-word keyword matches first, then partial matches in longer queries
+    keyword = router.route(user_input)
+    if keyword is not None:
+        return random.choice(RESPONSES[keyword])
+
+    return random.choice(DEFAULT_RESPONSES)
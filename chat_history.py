@@ -0,0 +1,110 @@
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from collections import deque
+
+# Messages kept in memory (and rendered) per session, and how many "load earlier" adds
+CHAT_WINDOW = int(os.environ.get("CHAT_WINDOW", 50))
+CHAT_PAGE_SIZE = int(os.environ.get("CHAT_PAGE_SIZE", 20))
+CHAT_HISTORY_DB = os.environ.get("CHAT_HISTORY_DB", "chat_history.sqlite3")
+
+# A session's spilled messages are deleted when the session goes away; rows left behind by
+# a crash are deleted after this many days when the database is opened (0 keeps them)
+CHAT_HISTORY_RETENTION_DAYS = float(os.environ.get("CHAT_HISTORY_RETENTION_DAYS", 7))
+
+_connections = {}
+_connections_lock = threading.Lock()
+_db_lock = threading.Lock()
+
+
+def _connect(db_path, retention_days=CHAT_HISTORY_RETENTION_DAYS):
+    """
+    One connection per database file, shared by every session behind a lock.
+    Messages older than ``retention_days`` are deleted when the file is first opened.
+    """
+    with _connections_lock:
+        if db_path not in _connections:
+            connection = sqlite3.connect(db_path, check_same_thread=False)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                "role TEXT NOT NULL, content TEXT NOT NULL, created REAL NOT NULL DEFAULT 0)"
+            )
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(messages)")]
+            if "created" not in columns:
+                # Files written before retention existed; their rows count as expired
+                connection.execute("ALTER TABLE messages ADD COLUMN created REAL NOT NULL DEFAULT 0")
+            connection.execute("CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, id)")
+            if retention_days > 0:
+                connection.execute("DELETE FROM messages WHERE created < ?",
+                                   (time.time() - retention_days * 86400,))
+            connection.commit()
+            _connections[db_path] = connection
+        return _connections[db_path]
+
+
+def _delete_session(db_path, session_id):
+    connection = _connect(db_path)
+    with _db_lock:
+        connection.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+        connection.commit()
+
+
+class ChatHistory:
+    """
+    Chat history for one session.
+
+    The latest ``window`` messages stay in memory; older ones are spilled to SQLite and
+    read back a page at a time, so memory and render cost don't grow with the conversation.
+    Spilled messages are deleted once the history is garbage collected with its session.
+    """
+
+    def __init__(self, session_id, window=CHAT_WINDOW, db_path=CHAT_HISTORY_DB):
+        self.session_id = session_id
+        self.window = window
+        self.db_path = db_path
+        self.recent = deque()
+        self.spilled = 0
+        self._finalizer = None
+
+    def append(self, role, content):
+        self.recent.append({"role": role, "content": content})
+        while len(self.recent) > self.window:
+            self._spill(self.recent.popleft())
+
+    def _spill(self, message):
+        connection = _connect(self.db_path)
+        with _db_lock:
+            connection.execute(
+                "INSERT INTO messages (session_id, role, content, created) VALUES (?, ?, ?, ?)",
+                (self.session_id, message["role"], message["content"], time.time()),
+            )
+            connection.commit()
+        self.spilled += 1
+        if self._finalizer is None:
+            self._finalizer = weakref.finalize(self, _delete_session, self.db_path, self.session_id)
+
+    def earlier(self, count):
+        """The ``count`` spilled messages just before the in-memory window, oldest first."""
+        if count <= 0 or not self.spilled:
+            return []
+        connection = _connect(self.db_path)
+        with _db_lock:
+            rows = connection.execute(
+                "SELECT role, content FROM messages WHERE session_id = ? ORDER BY id DESC LIMIT ?",
+                (self.session_id, count),
+            ).fetchall()
+        return [{"role": role, "content": content} for role, content in reversed(rows)]
+
+    def clear(self):
+        self.recent.clear()
+        if self._finalizer is not None:
+            # Deletes the spilled rows now rather than when the session goes away
+            self._finalizer()
+            self._finalizer = None
+        self.spilled = 0
+
+    def __len__(self):
+        return self.spilled + len(self.recent)
@@ -0,0 +1,180 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+import pandas as pd
+
+# live: fetch from Yahoo as usual; record: fetch live and save every response;
+# replay: serve only what was recorded, never touching the network
+MODES = ("live", "record", "replay")
+DATA_MODE = os.environ.get("DATA_MODE", "live")
+DATA_STORE_DIR = os.environ.get("DATA_STORE_DIR", "data_store")
+
+# History is stored as Parquet when pyarrow is installed, gzipped CSV otherwise
+try:
+    import pyarrow  # noqa: F401
+    HISTORY_FORMAT = "parquet"
+except ImportError:
+    HISTORY_FORMAT = "csv.gz"
+
+SAFE_NAME = re.compile(r"[^A-Za-z0-9._=^-]")
+
+
+def _write_atomic(path, data):
+    """Write bytes through a temporary file, so readers never see a partial file."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(handle, "wb") as output:
+            output.write(data)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+class DataStore:
+    """
+    Recorded quote info, price history and news pages under one directory:
+
+        info/<TICKER>.json.gz
+        history/<TICKER>/<period>.parquet (or .csv.gz)
+        news/<hash of the page path>.html.gz
+    """
+
+    def __init__(self, root=DATA_STORE_DIR):
+        self.root = root
+
+    def _ticker(self, ticker):
+        return SAFE_NAME.sub("_", ticker.upper())
+
+    def _info_path(self, ticker):
+        return os.path.join(self.root, "info", f"{self._ticker(ticker)}.json.gz")
+
+    def _history_path(self, ticker, period, fmt=None):
+        name = f"{SAFE_NAME.sub('_', period)}.{fmt or HISTORY_FORMAT}"
+        return os.path.join(self.root, "history", self._ticker(ticker), name)
+
+    def _page_path(self, key):
+        return os.path.join(self.root, "news", hashlib.blake2b(key.encode(), digest_size=12).hexdigest() + ".html.gz")
+
+    def save_info(self, ticker, info):
+        data = json.dumps(info, default=str, separators=(",", ":")).encode()
+        _write_atomic(self._info_path(ticker), gzip.compress(data))
+
+    def load_info(self, ticker):
+        try:
+            with gzip.open(self._info_path(ticker)) as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+
+    def save_history(self, ticker, period, hist):
+        path = self._history_path(ticker, period)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        os.close(handle)
+        try:
+            if HISTORY_FORMAT == "parquet":
+                hist.to_parquet(temporary, compression="zstd")
+            else:
+                hist.to_csv(temporary, compression="gzip")
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def load_history(self, ticker, period):
+        """
+        Recorded history in whichever format the recording machine had, or None if it was
+        never recorded. Raises RuntimeError for a Parquet recording without pyarrow, rather
+        than replaying it as if it were missing.
+        """
+        parquet = self._history_path(ticker, period, "parquet")
+        if os.path.exists(parquet) and HISTORY_FORMAT == "parquet":
+            return pd.read_parquet(parquet)
+        csv = self._history_path(ticker, period, "csv.gz")
+        if os.path.exists(csv):
+            hist = pd.read_csv(csv, index_col=0, compression="gzip")
+            # Exchange offsets change with daylight saving time, so timestamps come back in UTC
+            hist.index = pd.to_datetime(hist.index, utc=True)
+            return hist
+        if os.path.exists(parquet):
+            raise RuntimeError(f"{parquet} was recorded as Parquet; install pyarrow to replay it")
+        return None
+
+    def save_page(self, key, content):
+        _write_atomic(self._page_path(key), gzip.compress(content))
+
+    def load_page(self, key):
+        try:
+            with gzip.open(self._page_path(key)) as handle:
+                return handle.read()
+        except FileNotFoundError:
+            return None
+
+    def tickers(self):
+        """Tickers with recorded info, sorted."""
+        try:
+            names = os.listdir(os.path.join(self.root, "info"))
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len(".json.gz")] for name in names if name.endswith(".json.gz"))
+
+
+store = DataStore()
+
+
+def set_mode(mode):
+    global DATA_MODE
+    if mode not in MODES:
+        raise ValueError(f"Unknown data mode {mode!r}, use one of {MODES}")
+    DATA_MODE = mode
+
+
+def recording():
+    return DATA_MODE == "record"
+
+
+def replaying():
+    return DATA_MODE == "replay"
+
+
+def main(argv=None):
+    """Record quotes, history and news pages for replay, e.g. ``python data_store.py AAPL NVDA KO``."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Record market data and news into the replay store")
+    parser.add_argument("tickers", nargs="*", help="tickers to record")
+    parser.add_argument("--periods", nargs="+", default=["1mo", "1y"], help="history periods (default 1mo 1y)")
+    parser.add_argument("--news", nargs="*", default=[""],
+                        help="news searches to record; an empty string is the front page (default)")
+    parser.add_argument("--store", default=DATA_STORE_DIR, help=f"store directory (default {DATA_STORE_DIR})")
+    args = parser.parse_args(argv)
+
+    # Run as a script this file is __main__, so configure the module market_data and news use
+    import data_store
+    import market_data
+    import news
+
+    data_store.store = DataStore(args.store)
+    data_store.set_mode("record")
+
+    for period in args.periods:
+        if args.tickers:
+            _, _, errors = market_data.get_stock_data_many(args.tickers, period)
+            for ticker, error in errors.items():
+                print(f"{ticker} {period}: not recorded ({error})")
+    for query in args.news:
+        try:
+            print(f"news {query or '(front page)'}: {len(news.fetch_news(query or None))} articles")
+        except Exception as e:
+            print(f"news {query or '(front page)'}: not recorded ({e})")
+    print(f"{len(data_store.store.tickers())} tickers recorded in {args.store}")
+
+
+if __name__ == "__main__":
+    main()
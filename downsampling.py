@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# Most points a chart line gets; longer series are downsampled first
+CHART_MAX_POINTS = int(os.environ.get("CHART_MAX_POINTS", 1000))
+DOWNSAMPLE_METHOD = os.environ.get("CHART_DOWNSAMPLE", "lttb")
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Positions of the points kept by Largest-Triangle-Three-Buckets.
+
+    The first and last points are always kept; every bucket in between contributes the
+    point forming the largest triangle with the previously kept point and the next
+    bucket's average, which preserves peaks and troughs.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets over the interior points 1 .. n - 2
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    starts, ends = edges[:-1], edges[1:]
+
+    # Bucket averages in one pass; the last bucket looks ahead to the final point
+    counts = ends - starts
+    avg_x = np.append(np.add.reduceat(x[:n - 1], starts) / counts, x[-1])
+    avg_y = np.append(np.add.reduceat(y[:n - 1], starts) / counts, y[-1])
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i, (start, end) in enumerate(zip(starts, ends)):
+        bucket_x, bucket_y = x[start:end], y[start:end]
+        # Twice the triangle area for every candidate in the bucket
+        area = np.abs((x[a] - avg_x[i + 1]) * (bucket_y - y[a]) - (x[a] - bucket_x) * (avg_y[i + 1] - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """Positions of the minimum and maximum of each of ``n_out // 2`` equal buckets."""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    buckets = max(n_out // 2, 1)
+    if n_out >= n:
+        return np.arange(n)
+
+    # Pad to a full rectangle so the whole thing is one reshape and two arg-reductions
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = y
+    padded = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+
+    # Buckets that are all NaN (the padding, or a gap in the data) have no extremes to keep
+    valid = ~np.isnan(padded).all(axis=1)
+    lows = offsets[valid] + np.nanargmin(padded[valid], axis=1)
+    highs = offsets[valid] + np.nanargmax(padded[valid], axis=1)
+    return np.unique(np.concatenate(([0, n - 1], lows, highs)))
+
+
+def downsample(series, max_points=CHART_MAX_POINTS, method=DOWNSAMPLE_METHOD):
+    """Return ``series`` reduced to about ``max_points`` points, keeping its visual extremes."""
+    if len(series) <= max_points:
+        return series
+
+    if isinstance(series.index, pd.DatetimeIndex):
+        x = series.index.asi8
+    else:
+        x = np.arange(len(series))
+
+    if method == "minmax":
+        positions = minmax_indices(series.to_numpy(), max_points)
+    else:
+        positions = lttb_indices(x, series.to_numpy(), max_points)
+    return series.iloc[positions]
@@ -0,0 +1,58 @@
+import numpy as np
+
+# Percentile bands reported by the Monte Carlo projection
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+# Function for personal finance calculations
+def calculate_savings(income, expenses):
+    savings = income - expenses
+    savings_rate = (savings / income) * 100 if income > 0 else 0
+    return savings, savings_rate
+
+
+def _annuity_factor(monthly_rate, months):
+    """((1 + r)^n - 1) / r, and n where r == 0; works elementwise on arrays."""
+    monthly_rate, months = np.broadcast_arrays(np.asarray(monthly_rate, dtype=float), np.asarray(months, dtype=float))
+    growth = np.expm1(months * np.log1p(monthly_rate))
+    safe_rate = np.where(monthly_rate == 0, 1.0, monthly_rate)
+    return np.where(monthly_rate == 0, months, growth / safe_rate)
+
+
+def future_value(monthly_investment, annual_return, years):
+    """
+    Value after ``years`` of investing ``monthly_investment`` at the end of every month,
+    compounded monthly at ``annual_return`` percent (annuity closed form).
+    """
+    return float(monthly_investment * _annuity_factor(annual_return / 100 / 12, years * 12))
+
+
+def future_value_grid(annual_returns, years, monthly_investments):
+    """
+    Future values for every combination of the inputs at once.
+    Returns an array of shape ``(len(annual_returns), len(years), len(monthly_investments))``.
+    """
+    rates = np.asarray(annual_returns, dtype=float)[:, None, None] / 100 / 12
+    months = np.asarray(years, dtype=float)[None, :, None] * 12
+    contributions = np.asarray(monthly_investments, dtype=float)[None, None, :]
+    return contributions * _annuity_factor(rates, months)
+
+
+def simulate_future_value(monthly_investment, annual_return, annual_volatility, years,
+                          paths=2000, percentiles=PERCENTILES, seed=0):
+    """
+    Monte Carlo projection with normally distributed monthly returns.
+
+    Returns ``(months, bands)`` where ``bands[i]`` is the ``percentiles[i]`` value of the
+    portfolio at the end of each month. A fixed ``seed`` keeps the bands steady while
+    sliders move.
+    """
+    rng = np.random.default_rng(seed)
+    months = int(years * 12)
+    returns = rng.normal(annual_return / 100 / 12, annual_volatility / 100 / np.sqrt(12), size=(paths, months))
+
+    # value_t = sum over contributions k <= t of P * growth_t / growth_k
+    growth = np.cumprod(1 + returns, axis=1)
+    values = growth * np.cumsum(monthly_investment / growth, axis=1)
+
+    return np.arange(1, months + 1), np.percentile(values, percentiles, axis=0)
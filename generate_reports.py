@@ -0,0 +1,197 @@
+import argparse
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+
+import pandas as pd
+
+from valuation_template import DEFAULT_TEMPLATE, load_template
+
+# Generated workbooks go to an untracked directory, so the sample workbooks in Analysis/
+# are never overwritten unless --output-dir points there
+OUTPUT_DIR = os.environ.get("REPORTS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports"))
+
+# Template input cells filled from the quote info: (cell, info key, multiplier).
+# The template works in percentages where yfinance reports fractions.
+INFO_INPUTS = [
+    ("Score!B5", "revenueGrowth", 100),
+    ("Score!B14", "grossMargins", 100),
+    ("Score!B16", "operatingMargins", 100),
+    ("Score!B18", "profitMargins", 100),
+    ("Score!B20", "returnOnEquity", 100),
+    ("Score!B22", "returnOnAssets", 100),
+    ("Score!B30", "payoutRatio", 100),
+    ("Score!B32", "dividendYield", 100),
+    ("Score!B40", "debtToEquity", 1),
+    ("Score!B48", "trailingPE", 1),
+    ("Score!B50", "pegRatio", 1),
+    ("Score!B52", "priceToBook", 1),
+    ("Valeur Intrasèque!B4", "bookValue", 1),
+    ("Valeur Intrasèque!B6", "trailingEps", 1),
+    ("Valeur Intrasèque!B7", "earningsGrowth", 100),
+    ("Valeur Intrasèque!B9", "trailingPE", 1),
+]
+PRICE_INPUTS = ["Score!M1", "Valeur Intrasèque!B3"]
+
+# Per-stock cells yfinance has no field for; they are left blank for the analyst.
+# The remaining constants (bond yield Y, target P/E, margin of safety) keep the template's values.
+MANUAL_INPUTS = ["Score!B7", "Score!B28", "Score!B34", "Score!B54"]
+
+
+@lru_cache(maxsize=None)
+def template_layout(path):
+    """Cell values, column widths and tables of every template sheet, read once per process."""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path)
+    sheets = []
+    for sheet in workbook.worksheets:
+        rows = [[cell.value for cell in row] for row in sheet.iter_rows(min_row=1, min_col=1)]
+        widths = {letter: dimension.width for letter, dimension in sheet.column_dimensions.items()
+                  if dimension.width}
+        tables = [(table.name, table.ref, table.tableStyleInfo, [column.name for column in table.tableColumns])
+                  for table in sheet.tables.values()]
+        sheets.append((sheet.title, rows, widths, tables))
+    return sheets
+
+
+def report_inputs(info, hist):
+    """Template cell -> value for one stock; None where the data has no value."""
+    price = info.get('regularMarketPrice') or info.get('currentPrice') or info.get('previousClose')
+    if price is None and not hist.empty:
+        price = round(float(hist['Close'].iloc[-1]), 2)
+
+    inputs = {address: price for address in PRICE_INPUTS}
+    for address, key, multiplier in INFO_INPUTS:
+        value = info.get(key)
+        inputs[address] = round(value * multiplier, 4) if isinstance(value, (int, float)) else None
+
+    debt, ebitda = info.get('totalDebt'), info.get('ebitda')
+    inputs["Score!B42"] = round(debt / ebitda, 2) if debt is not None and ebitda else None
+    for address in MANUAL_INPUTS:
+        inputs.setdefault(address, None)
+    return inputs
+
+
+def write_report(path, inputs, template_path=DEFAULT_TEMPLATE):
+    """Write the template layout with ``inputs`` filled in, streaming rows in write-only mode."""
+    from openpyxl import Workbook
+    from openpyxl.utils import get_column_letter
+    from openpyxl.worksheet.table import Table, TableColumn
+
+    workbook = Workbook(write_only=True)
+    for title, rows, widths, tables in template_layout(template_path):
+        sheet = workbook.create_sheet(title)
+        for letter, width in widths.items():
+            sheet.column_dimensions[letter].width = width
+        for name, ref, style, columns in tables:
+            # Write-only sheets can't derive table columns from the cells, so copy them over
+            table = Table(displayName=name, ref=ref, tableStyleInfo=style)
+            table.tableColumns = [TableColumn(id=index, name=column) for index, column in enumerate(columns, start=1)]
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", UserWarning)
+                sheet.add_table(table)
+
+        for row_number, row in enumerate(rows, start=1):
+            values = list(row)
+            for column_number in range(1, len(values) + 1):
+                address = f"{title}!{get_column_letter(column_number)}{row_number}"
+                if address in inputs:
+                    values[column_number - 1] = inputs[address]
+            sheet.append(values)
+
+    workbook.save(path)
+
+
+def build_report(ticker, output_dir=OUTPUT_DIR, period="1y", template_path=DEFAULT_TEMPLATE):
+    """Fetch one ticker and write its workbook; runs in a worker process."""
+    from market_data import get_stock_data
+
+    _, info, hist = get_stock_data(ticker, period)
+    inputs = report_inputs(info, hist)
+    path = os.path.join(output_dir, f"{ticker}_analysis.xlsx")
+    write_report(path, inputs, template_path)
+    return ticker, path, inputs
+
+
+def summarize(results, template_path=DEFAULT_TEMPLATE):
+    """Score and intrinsic values for every report, valued in one vectorized call."""
+    # Blank cells count as zero, as they do when the workbook is opened in Excel
+    frame = pd.DataFrame({ticker: inputs for ticker, inputs in results.items()}).T.astype(float).fillna(0.0)
+    return load_template(template_path).evaluate_frame(frame).round(2)
+
+
+def read_universe(path):
+    """Tickers from a file, one per line or comma separated; '#' starts a comment."""
+    with open(path, encoding="utf-8") as handle:
+        text = "\n".join(line.split("#", 1)[0] for line in handle)
+    return [ticker.strip().upper() for ticker in text.replace(",", "\n").split() if ticker.strip()]
+
+
+def generate_reports(tickers, output_dir=OUTPUT_DIR, period="1y", workers=None, template_path=DEFAULT_TEMPLATE,
+                     progress=print):
+    """
+    Write ``<TICKER>_analysis.xlsx`` for every ticker using a process pool.
+    Returns ``(results, errors, elapsed)``: ticker -> inputs for the reports written and
+    ticker -> message for the ones that failed.
+    """
+    tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+    os.makedirs(output_dir, exist_ok=True)
+    results, errors = {}, {}
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(build_report, ticker, output_dir, period, template_path): ticker
+            for ticker in tickers
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            ticker = futures[future]
+            try:
+                _, path, inputs = future.result()
+            except Exception as e:
+                errors[ticker] = str(e) or type(e).__name__
+                progress(f"[{done}/{len(tickers)}] {ticker}: failed ({errors[ticker]})")
+                continue
+            results[ticker] = inputs
+            # Failed reports don't count towards the throughput
+            rate = len(results) / (time.perf_counter() - start)
+            progress(f"[{done}/{len(tickers)}] {ticker} -> {path} ({rate:.1f} reports/s)")
+
+    return results, errors, time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate <TICKER>_analysis.xlsx valuation reports")
+    parser.add_argument("tickers", nargs="*", help="ticker symbols, e.g. AAPL MSFT")
+    parser.add_argument("--universe", help="file with one ticker per line (or comma separated)")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR, help=f"where to write the workbooks (default {OUTPUT_DIR})")
+    parser.add_argument("--period", default="1y", help="price history period used for the last close")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--template", default=DEFAULT_TEMPLATE, help="valuation template workbook")
+    args = parser.parse_args(argv)
+
+    tickers = list(args.tickers)
+    if args.universe:
+        tickers += read_universe(args.universe)
+    if not tickers:
+        parser.error("give tickers or --universe")
+
+    results, errors, elapsed = generate_reports(tickers, args.output_dir, args.period, args.workers, args.template)
+
+    if results:
+        print()
+        print(summarize(results, args.template).sort_values("score", ascending=False).to_string())
+    print(f"\nWrote {len(results)} reports in {elapsed:.2f}s ({len(results) / elapsed:.1f} reports/s)")
+    if errors:
+        print(f"{len(errors)} failed:", file=sys.stderr)
+        for ticker, error in sorted(errors.items()):
+            print(f"  {ticker}: {error}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from ttl_cache import TTLCache
+
+# Window lengths, in bars
+SMA_WINDOWS = (20, 50)
+EMA_SPANS = (12, 26)
+MACD_SIGNAL_SPAN = 9
+RSI_PERIOD = 14
+BOLLINGER_WINDOW = 20
+BOLLINGER_STDS = 2
+VOLATILITY_WINDOW = 20
+AVG_VOLUME_WINDOW = 63  # about three months, like yfinance's averageVolume
+TRADING_DAYS = 252
+
+# Rows of history needed before the first new bar to recompute every rolling window
+LOOKBACK_BARS = max(SMA_WINDOWS + (BOLLINGER_WINDOW, VOLATILITY_WINDOW + 1, AVG_VOLUME_WINDOW))
+
+# Bars after which the starting point of the EMA/RSI recursions no longer shows (its weight
+# drops below 1e-6 for the slowest one, Wilder's RSI). Cached indicators are only carried
+# over to a window that slid forward when its new bars start at least this far in, so they
+# agree with computing the window from scratch.
+WARMUP_BARS = int(np.ceil(np.log(1e-6) / np.log(1 - 1 / RSI_PERIOD)))
+
+indicator_cache = TTLCache(
+    maxsize=int(os.environ.get("INDICATOR_CACHE_SIZE", 256)),
+    ttl=float(os.environ.get("INDICATOR_CACHE_TTL", 300)),
+)
+
+
+def _ewm(values, alpha, seed=None):
+    """Recursive EWM (``adjust=False``), optionally continuing from the previous bar's value."""
+    if seed is None or np.isnan(seed):
+        return values.ewm(alpha=alpha, adjust=False).mean()
+    seeded = np.concatenate(([seed], values.to_numpy(dtype=float)))
+    smoothed = pd.Series(seeded).ewm(alpha=alpha, adjust=False).mean().to_numpy()[1:]
+    return pd.Series(smoothed, index=values.index)
+
+
+def _rolling_indicators(hist):
+    """Window-based indicators; each value depends only on the last few bars."""
+    close = hist['Close']
+    high = hist['High'] if 'High' in hist else close
+    low = hist['Low'] if 'Low' in hist else close
+
+    out = pd.DataFrame(index=hist.index)
+    for window in SMA_WINDOWS:
+        out[f"SMA_{window}"] = close.rolling(window).mean()
+
+    middle = close.rolling(BOLLINGER_WINDOW).mean()
+    spread = BOLLINGER_STDS * close.rolling(BOLLINGER_WINDOW).std()
+    out["BB_Upper"] = middle + spread
+    out["BB_Middle"] = middle
+    out["BB_Lower"] = middle - spread
+
+    # Annualised volatility of daily log returns
+    log_returns = np.log(close).diff()
+    out[f"Volatility_{VOLATILITY_WINDOW}"] = log_returns.rolling(VOLATILITY_WINDOW).std() * np.sqrt(TRADING_DAYS)
+
+    # 52-week range over calendar time, so it works for any bar size
+    out["High_52W"] = high.rolling("365D").max()
+    out["Low_52W"] = low.rolling("365D").min()
+
+    if 'Volume' in hist:
+        out["AvgVolume"] = hist['Volume'].rolling(AVG_VOLUME_WINDOW, min_periods=1).mean()
+    return out
+
+
+def _recursive_indicators(close, previous_close=None, seed=None):
+    """
+    EMA-based indicators. ``seed`` is the last row of previously computed indicators and
+    ``previous_close`` the close before ``close`` starts, to continue the recursions.
+    """
+    seed = seed if seed is not None else {}
+    out = pd.DataFrame(index=close.index)
+    for span in EMA_SPANS:
+        out[f"EMA_{span}"] = _ewm(close, 2 / (span + 1), seed.get(f"EMA_{span}"))
+
+    out["MACD"] = out[f"EMA_{EMA_SPANS[0]}"] - out[f"EMA_{EMA_SPANS[1]}"]
+    out["MACD_Signal"] = _ewm(out["MACD"], 2 / (MACD_SIGNAL_SPAN + 1), seed.get("MACD_Signal"))
+    out["MACD_Hist"] = out["MACD"] - out["MACD_Signal"]
+
+    # Wilder's RSI
+    change = close.diff()
+    if previous_close is not None:
+        change.iloc[0] = close.iloc[0] - previous_close
+    avg_gain = _ewm(change.clip(lower=0), 1 / RSI_PERIOD, seed.get(f"AvgGain_{RSI_PERIOD}"))
+    avg_loss = _ewm(-change.clip(upper=0), 1 / RSI_PERIOD, seed.get(f"AvgLoss_{RSI_PERIOD}"))
+    out[f"AvgGain_{RSI_PERIOD}"] = avg_gain
+    out[f"AvgLoss_{RSI_PERIOD}"] = avg_loss
+    out[f"RSI_{RSI_PERIOD}"] = 100 - 100 / (1 + avg_gain / avg_loss)
+    return out
+
+
+def compute_indicators(hist):
+    """All indicators for every bar of a ``get_stock_data`` history frame."""
+    return pd.concat([_rolling_indicators(hist), _recursive_indicators(hist['Close'])], axis=1)
+
+
+def extend_indicators(hist, indicators, start):
+    """
+    Indicators for ``hist`` when ``indicators`` already covers ``hist.iloc[:start]``.
+    Only the bars from ``start`` on are computed, using just enough earlier history to fill
+    the rolling windows and the previous row to continue the recursive ones.
+    """
+    if start <= 0 or indicators.empty:
+        return compute_indicators(hist)
+    if start >= len(hist):
+        return indicators
+
+    first_new = hist.index[start]
+    context_start = min(
+        max(start - LOOKBACK_BARS, 0),
+        hist.index.searchsorted(first_new - pd.Timedelta(days=365)),
+    )
+    window = hist.iloc[context_start:]
+    rolling = _rolling_indicators(window).iloc[start - context_start:]
+
+    recursive = _recursive_indicators(
+        hist['Close'].iloc[start:],
+        previous_close=hist['Close'].iloc[start - 1],
+        seed=indicators.iloc[-1].to_dict(),
+    )
+    new_rows = pd.concat([rolling, recursive], axis=1)[indicators.columns]
+    return pd.concat([indicators, new_rows])
+
+
+def _reusable_rows(previous_hist, hist):
+    """
+    ``(offset, rows)`` when the first ``rows`` bars of ``hist`` are bars ``offset`` onwards of
+    ``previous_hist``, so their cached indicators can be reused: the shared bars minus the
+    latest one, which may have been revised. ``offset`` is how far the window slid forward.
+    None when the bars don't line up or the last reused bar changed.
+    """
+    if hist.empty or previous_hist.empty:
+        return None
+    offset = previous_hist.index.searchsorted(hist.index[0])
+    if offset >= len(previous_hist) or previous_hist.index[offset] != hist.index[0]:
+        return None
+
+    shared = len(previous_hist) - offset
+    if shared > len(hist) or not hist.index[:shared].equals(previous_hist.index[offset:]):
+        return None
+    rows = shared - 1
+    if offset and rows < WARMUP_BARS:
+        return None
+    if rows <= 0 or hist['Close'].iloc[rows - 1] != previous_hist['Close'].iloc[offset + rows - 1]:
+        return None
+    return offset, rows
+
+
+def get_indicators(ticker, period, hist):
+    """
+    Indicators for a history frame, cached per (ticker, period).
+    When ``hist`` is the cached frame with bars appended (or the latest bar revised), only
+    the new bars are computed. That includes a period window that slid forward: the bars it
+    still shares keep the values computed with the bars that dropped off, and the new ones
+    agree with computing the window from scratch (to within 1e-6 for EMA/RSI).
+    """
+    key = (ticker, period)
+    cached = indicator_cache.get(key)
+
+    if cached is not None:
+        previous_hist, previous_indicators = cached
+        if previous_hist is hist:
+            return previous_indicators
+
+        reusable = _reusable_rows(previous_hist, hist)
+        if reusable is not None:
+            offset, rows = reusable
+            indicators = extend_indicators(hist, previous_indicators.iloc[offset:offset + rows], rows)
+            indicator_cache.set(key, (hist, indicators))
+            return indicators
+
+    indicators = compute_indicators(hist)
+    indicator_cache.set(key, (hist, indicators))
+    return indicators
+
+
+def latest(indicators):
+    """The most recent indicator values as a plain dict (NaN for windows not yet filled)."""
+    return indicators.iloc[-1].to_dict() if not indicators.empty else {}
@@ -0,0 +1,186 @@
+import bisect
+import cProfile
+import functools
+import os
+import threading
+import time
+from datetime import datetime
+
+# Timers are on unless METRICS_ENABLED=0; when off they cost one flag check per call
+ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+
+# Upper bounds (seconds) of the histogram buckets, as in the Prometheus client defaults
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_NAME = "financial_assistant_stage_seconds"
+
+# Per-rerun cProfile dumps (opt in with PROFILE_RERUNS=1 or from the admin panel)
+PROFILE_RERUNS = os.environ.get("PROFILE_RERUNS") == "1"
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+
+
+class Histogram:
+    """Bucketed latency distribution for one stage."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+            if seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q):
+        """Estimate of the ``q`` quantile, interpolated within its bucket."""
+        with self._lock:
+            counts, count, largest = list(self.counts), self.count, self.max
+        if not count:
+            return None
+        rank = q * count
+        seen, lower = 0, 0.0
+        for index, bucket_count in enumerate(counts):
+            upper = self.buckets[index] if index < len(self.buckets) else largest
+            if bucket_count and seen + bucket_count >= rank:
+                return min(lower + (upper - lower) * (rank - seen) / bucket_count, largest)
+            seen += bucket_count
+            lower = upper
+        return largest
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def histogram(stage):
+    histogram = _histograms.get(stage)
+    if histogram is None:
+        with _histograms_lock:
+            histogram = _histograms.setdefault(stage, Histogram())
+    return histogram
+
+
+def observe(stage, seconds):
+    if ENABLED:
+        histogram(stage).observe(seconds)
+
+
+class timer:
+    """
+    Time a block or a function under ``stage``:
+
+        with timer("news.parse"):
+            ...
+
+        @timer("stock.info")
+        def request_info(stock): ...
+    """
+
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter() if ENABLED else None
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            histogram(self.stage).observe(time.perf_counter() - self.start)
+        return False
+
+    def __call__(self, func):
+        stage = self.stage
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram(stage).observe(time.perf_counter() - start)
+
+        return wrapper
+
+
+def set_enabled(enabled):
+    global ENABLED
+    ENABLED = bool(enabled)
+
+
+def reset():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+def snapshot():
+    """stage -> count, mean and estimated p50/p95/p99 in milliseconds, sorted by total time."""
+    with _histograms_lock:
+        items = list(_histograms.items())
+    rows = {}
+    for stage, hist in sorted(items, key=lambda item: -item[1].sum):
+        if not hist.count:
+            continue
+        rows[stage] = {
+            "count": hist.count,
+            "total_ms": hist.sum * 1000,
+            "mean_ms": hist.sum / hist.count * 1000,
+            "p50_ms": hist.quantile(0.5) * 1000,
+            "p95_ms": hist.quantile(0.95) * 1000,
+            "p99_ms": hist.quantile(0.99) * 1000,
+            "max_ms": hist.max * 1000,
+        }
+    return rows
+
+
+def prometheus_text():
+    """All histograms in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {METRIC_NAME} Time spent per stage.",
+        f"# TYPE {METRIC_NAME} histogram",
+    ]
+    with _histograms_lock:
+        items = sorted(_histograms.items())
+    for stage, hist in items:
+        with hist._lock:
+            counts, count, total = list(hist.counts), hist.count, hist.sum
+        label = stage.replace("\\", "\\\\").replace('"', '\\"')
+        cumulative = 0
+        for bound, bucket_count in zip(list(hist.buckets) + ["+Inf"], counts):
+            cumulative += bucket_count
+            lines.append(f'{METRIC_NAME}_bucket{{stage="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'{METRIC_NAME}_sum{{stage="{label}"}} {total}')
+        lines.append(f'{METRIC_NAME}_count{{stage="{label}"}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+def start_profile(enabled=None):
+    """Start a cProfile capture when profiling is on; pass the result to stop_profile()."""
+    if not (PROFILE_RERUNS if enabled is None else enabled):
+        return None
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+
+def stop_profile(profiler, name="rerun", directory=None):
+    """Stop a capture from start_profile() and write it to disk; returns the .prof path."""
+    if profiler is None:
+        return None
+    profiler.disable()
+    directory = directory or PROFILE_DIR
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}-{datetime.now():%Y%m%d-%H%M%S-%f}.prof")
+    profiler.dump_stats(path)
+    return path
@@ -0,0 +1,76 @@
+import pickle
+
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+
+class IntentIndex:
+    """
+    TF-IDF index over intent keys, fitted once.
+
+    Matching a message costs one ``transform`` and one sparse dot product: rows are
+    L2-normalised, so the dot product is the cosine similarity.
+    """
+
+    def __init__(self, preprocess=None):
+        self.preprocess = preprocess or (lambda text: text)
+        self.vectorizer = TfidfVectorizer()
+        self.keys = []
+        self.matrix = None
+
+    def fit(self, keys):
+        self.keys = list(keys)
+        self.matrix = self.vectorizer.fit_transform([self.preprocess(key) for key in self.keys])
+        return self
+
+    def refit(self):
+        """Rebuild vocabulary and IDF weights from the current keys."""
+        return self.fit(self.keys)
+
+    def add(self, key):
+        """
+        Add (or replace) an intent without refitting.
+        The vocabulary and IDF weights stay frozen, so words the index has never seen
+        are ignored for this key until ``refit()`` is called. An index that hasn't been
+        fitted yet is fitted on this key.
+        """
+        if self.matrix is None:
+            self.fit(self.keys + [key])
+            return
+        row = self.vectorizer.transform([self.preprocess(key)])
+        if key in self.keys:
+            self.remove(key)
+        self.keys.append(key)
+        self.matrix = sparse.vstack([self.matrix, row], format="csr")
+
+    def remove(self, key):
+        position = self.keys.index(key)
+        keep = [i for i in range(len(self.keys)) if i != position]
+        self.matrix = self.matrix[keep]
+        del self.keys[position]
+
+    def scores(self, text):
+        """Cosine similarity of ``text`` against every key, in key order."""
+        query = self.vectorizer.transform([self.preprocess(text)])
+        return (self.matrix @ query.T).toarray().ravel()
+
+    def match(self, text):
+        """Return ``(best_key, score)`` for ``text``."""
+        scores = self.scores(text)
+        best = scores.argmax()
+        return self.keys[best], scores[best]
+
+    def save(self, path):
+        # The preprocess function is not stored; pass it again to load()
+        with open(path, "wb") as f:
+            pickle.dump({"vectorizer": self.vectorizer, "keys": self.keys, "matrix": self.matrix}, f)
+
+    @classmethod
+    def load(cls, path, preprocess=None):
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        index = cls(preprocess)
+        index.vectorizer = state["vectorizer"]
+        index.keys = state["keys"]
+        index.matrix = state["matrix"]
+        return index
@@ -0,0 +1,77 @@
+from collections import deque
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton: finds every occurrence of every keyword in one pass over the text."""
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        # Trie of all keywords
+        for index, keyword in enumerate(self.keywords):
+            node = 0
+            for char in keyword:
+                if char not in self._goto[node]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                    self._goto[node][char] = len(self._goto) - 1
+                node = self._goto[node][char]
+            self._out[node].append(index)
+
+        # Failure links, breadth first, so each node also reports the keywords ending at its suffixes
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def iter_matches(self, text):
+        """Yield ``(keyword_index, start, end)`` for every match, in order of end position."""
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(char, 0)
+            for index in self._out[node]:
+                yield index, position + 1 - len(self.keywords[index]), position + 1
+
+
+class KeywordRouter:
+    """
+    Pick the keyword a message should be routed to.
+
+    Keywords are given in priority order. A keyword that appears as a whole
+    whitespace-separated word beats any substring match; within each group the
+    earlier keyword wins. Both are found in a single pass over the message.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = list(keywords)
+        self._automaton = AhoCorasick(self.keywords)
+        # Keywords containing whitespace can never equal a single word
+        self._single_word = [not any(char.isspace() for char in keyword) for keyword in self.keywords]
+
+    def route(self, text):
+        """Return the best matching keyword, or None."""
+        best = None
+        for index, start, end in self._automaton.iter_matches(text):
+            whole_word = (
+                self._single_word[index]
+                and (start == 0 or text[start - 1].isspace())
+                and (end == len(text) or text[end].isspace())
+            )
+            rank = (0 if whole_word else 1, index)
+            if best is None or rank < best:
+                best = rank
+                if rank == (0, 0):
+                    break  # Nothing can beat the top keyword as a whole word
+        return None if best is None else self.keywords[best[1]]
@@ -1,21 +1,32 @@
-import random
-from stocks_consulting import *
-from yahoo_articles import *
-from personal_finance import *
-from stock_recommendation import *
-import nltk
-import re
-
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import time
 
-nltk.download('punkt')
-nltk.download('stopwords')
+# Cold-start timings are measured from here
+_STARTED = time.perf_counter()
 
-from string import punctuation
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
+import argparse
+import importlib
+import os
+import random
+import sys
+import threading
+
+import instrumentation
+import setup_nltk
+
+# Helper modules behind the function intents; imported on first use, not at startup
+HELPER_MODULES = ["stocks_consulting", "yahoo_articles", "personal_finance", "stock_recommendation"]
+
+def helper(name):
+    """Stand-in for a helper function that imports its module only when it is called."""
+    def call(*args, **kwargs):
+        # Later modules win, as they did with the original star imports
+        for module_name in reversed(HELPER_MODULES):
+            module = importlib.import_module(module_name)
+            if hasattr(module, name):
+                return getattr(module, name)(*args, **kwargs)
+        raise AttributeError(f"No helper module defines {name}")
+    call.__name__ = name
+    return call
 
 responses = {
     "hello": [
@@ -45,12 +56,47 @@ responses = {
         "I can provide guidance on budgeting, investments, retirement planning, and more. Feel free to ask me any questions related to personal finance!",
         "You can ask me about budgeting strategies, investment tips, and retirement planning. How can I assist you today?",
     ],
-    "personal finance": get_personal_finance,
-    "stock recommendation": get_stock_recommendation,
-    "yahoo advice articles": get_financial_advices,
+    "personal finance": helper("get_personal_finance"),
+    "stock recommendation": helper("get_stock_recommendation"),
+    "yahoo advice articles": helper("get_financial_advices"),
     "default": "I don't understand. Can you rephrase your question?",
 }
 
+# Optional path where the fitted intent index is saved and loaded from on startup
+INTENT_INDEX_PATH = os.environ.get("INTENT_INDEX_PATH")
+
+# NLTK, scikit-learn and the fitted index are loaded lazily, see load_models()
+preprocessor = None
+intent_index = None
+_models_lock = threading.RLock()
+
+# Seconds spent in each startup stage, for --timing
+timings = {}
+
+def _timed(stage, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    timings[stage] = time.perf_counter() - start
+    instrumentation.observe(f"startup.{stage}", timings[stage])
+    return result
+
+def load_preprocessor():
+    """Import NLTK and build the shared preprocessor, once."""
+    global preprocessor
+    with _models_lock:
+        if preprocessor is None:
+            text_preprocessor = _timed("import nltk", importlib.import_module, "text_preprocessor")
+            preprocessor = _timed("load stopwords + lemmatizer", text_preprocessor.TextPreprocessor)
+
+def load_models():
+    """Import NLTK/scikit-learn and build the preprocessor and intent index, once."""
+    global intent_index
+    with _models_lock:
+        load_preprocessor()
+        if intent_index is None:
+            _timed("import scikit-learn", importlib.import_module, "intent_index")
+            intent_index = _timed("build intent index", build_intent_index)
+
 def clean_text(text):
     """
     Cleans text by:
@@ -58,53 +104,37 @@ def clean_text(text):
       2) Removing bracketed content [ ... ] (if any).
       3) Converting multiple spaces into a single space.
     """
-    # 1) Remove any characters that are not letters
-    text = re.sub(r'[^a-zA-Z]', ' ', text)
-    # 2) Remove bracketed content (and brackets themselves)
-    text = re.sub(r'\[.*?\]', ' ', text)
-    # 3) Replace multiple spaces with a single space
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+    load_preprocessor()
+    return preprocessor.clean(text)
 
 def preprocess_text(text):
-    # Basic cleaning
-    text = clean_text(text)
+    load_preprocessor()
+    return preprocessor.preprocess(text)
 
-    # Build a stoplist of English stopwords + punctuation
-    stoplist = set(stopwords.words('english') + list(punctuation))
+def build_intent_index(path=INTENT_INDEX_PATH):
+    """Load the intent index from disk if it matches the current responses, otherwise fit it."""
+    from intent_index import IntentIndex
 
-    # Tokenize
-    tokens = word_tokenize(text.lower())
+    if path and os.path.exists(path):
+        index = IntentIndex.load(path, preprocess_text)
+        if index.keys == list(responses.keys()):
+            return index
 
-    # Filter out stopwords and non-alphanumeric tokens
-    filtered_tokens = [word for word in tokens if word.isalnum() and word not in stoplist]
-
-    # Lemmatize
-    lemmatizer = WordNetLemmatizer()
-    filtered_tokens = [lemmatizer.lemmatize(word) for word in filtered_tokens]
-
-    # Return the cleaned text
-    return ' '.join(filtered_tokens)
+    index = IntentIndex(preprocess_text).fit(responses.keys())
+    if path:
+        index.save(path)
+    return index
 
 def generate_response(user_input):
-    preprocessed_input = preprocess_text(user_input)
-
-    # Vectorize all keys + the user input
-    vectorizer = TfidfVectorizer()
-    key_vectors = [preprocess_text(key) for key in responses.keys()]
-    key_vectors.append(preprocessed_input)
-
-    # Build TF-IDF matrix
-    tfidf_matrix = vectorizer.fit_transform(key_vectors)
-    # Similarity of user input (last item) vs. all keys (the rest)
-    similarity_scores = cosine_similarity(tfidf_matrix[-1], tfidf_matrix[:-1])[0]
+    # Waits for the background warm-up if it is still running
+    load_models()
 
-    # Find best match
-    best_match_index = similarity_scores.argmax()
-    matched_key = list(responses.keys())[best_match_index % len(responses)]
+    # Find best match against the intent index
+    with instrumentation.timer("console.intent_match"):
+        matched_key, score = intent_index.match(user_input)
 
     # Decide if match is good enough
-    if similarity_scores[best_match_index] > 0.1:
+    if score > 0.1:
         response = responses[matched_key]
         # If the response is a function, call it
         if callable(response):
@@ -120,12 +150,36 @@ def generate_response(user_input):
 
     return response
 
-def start_chat():
+def check_nltk_resources(offline=False):
+    """Verify NLTK data on disk; download what is missing unless running offline."""
+    missing = _timed("nltk resource check", setup_nltk.missing_resources)
+    if not missing:
+        return True
+    if offline:
+        print(f"Missing NLTK resources: {', '.join(missing)}. Run 'python setup_nltk.py' first.", file=sys.stderr)
+        return False
+    return _timed("nltk download", setup_nltk.download_nltk_resources, missing)
+
+def print_timings(stages):
+    for stage in stages:
+        if stage in timings:
+            print(f"  {stage:<28} {timings[stage] * 1000:8.1f} ms")
+
+def start_chat(show_timings=False):
+    # Load the models while the user reads the prompt and types
+    threading.Thread(target=load_models, name="warm-up", daemon=True).start()
+
     print(
         "\nChatbot: Hello, I am your Financial Advisor Bot. "
         "Feel free to ask me any questions related to personal finance:"
     )
 
+    if show_timings:
+        timings["time to prompt"] = time.perf_counter() - _STARTED
+        print("\nStartup timing:")
+        print_timings(["python imports", "nltk resource check", "nltk download", "time to prompt"])
+
+    first_message = True
     while True:
         user_input = input("\nUser: ").lower()
 
@@ -135,8 +189,31 @@ def start_chat():
             break
 
         # Generate response
+        start = time.perf_counter()
         bot_response = generate_response(user_input)
         print("Chatbot:", bot_response)
 
-# Start the console chat
-start_chat()
\ No newline at end of file
+        if show_timings and first_message:
+            timings["first response"] = time.perf_counter() - start
+            print("\nModel loading (in the background since startup):")
+            print_timings(["import nltk", "load stopwords + lemmatizer", "import scikit-learn",
+                           "build intent index", "first response"])
+        first_message = False
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Console Financial Advisor Bot")
+    parser.add_argument("--offline", action="store_true",
+                        help="never download NLTK data; fail if it is missing")
+    parser.add_argument("--timing", action="store_true", help="print a cold-start timing breakdown")
+    args = parser.parse_args(argv)
+
+    timings["python imports"] = time.perf_counter() - _STARTED
+
+    if not check_nltk_resources(offline=args.offline or os.environ.get("CHATBOT_OFFLINE") == "1"):
+        sys.exit(1)
+
+    # Start the console chat
+    start_chat(show_timings=args.timing)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,452 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+
+import pandas as pd
+import yfinance as yf
+
+import data_store
+from instrumentation import timer
+from synthetic_data import generate_history
+from ttl_cache import TTLCache
+
+# Demo stock data for common stocks
+DEMO_STOCKS = {
+    "AAPL": {
+        "name": "Apple Inc.",
+        "price": 169.75,
+        "change": 1.23,
+        "percent_change": 0.73,
+        "market_cap": "2.67T",
+        "sector": "Technology",
+        "pe_ratio": 28.12,
+        "dividend_yield": 0.54,
+        "description": "Apple Inc. designs, manufactures, and markets smartphones, personal computers, tablets, wearables, and accessories worldwide."
+    },
+    "MSFT": {
+        "name": "Microsoft Corporation",
+        "price": 415.32,
+        "change": 2.45,
+        "percent_change": 0.59,
+        "market_cap": "3.09T",
+        "sector": "Technology",
+        "pe_ratio": 35.67,
+        "dividend_yield": 0.73,
+        "description": "Microsoft Corporation develops, licenses, and supports software, services, devices, and solutions worldwide."
+    },
+    "GOOGL": {
+        "name": "Alphabet Inc.",
+        "price": 147.68,
+        "change": -0.87,
+        "percent_change": -0.59,
+        "market_cap": "1.85T",
+        "sector": "Technology",
+        "pe_ratio": 25.34,
+        "dividend_yield": 0.0,
+        "description": "Alphabet Inc. provides various products and platforms in the United States, Europe, the Middle East, Africa, the Asia-Pacific, Canada, and Latin America."
+    },
+    "AMZN": {
+        "name": "Amazon.com, Inc.",
+        "price": 178.75,
+        "change": 1.05,
+        "percent_change": 0.59,
+        "market_cap": "1.86T",
+        "sector": "Consumer Cyclical",
+        "pe_ratio": 61.23,
+        "dividend_yield": 0.0,
+        "description": "Amazon.com, Inc. engages in the retail sale of consumer products and subscriptions in North America and internationally."
+    },
+    "TSLA": {
+        "name": "Tesla, Inc.",
+        "price": 176.75,
+        "change": -3.25,
+        "percent_change": -1.81,
+        "market_cap": "562.5B",
+        "sector": "Automotive",
+        "pe_ratio": 50.12,
+        "dividend_yield": 0.0,
+        "description": "Tesla, Inc. designs, develops, manufactures, leases, and sells electric vehicles, and energy generation and storage systems."
+    }
+}
+
+
+# Cache settings, overridable through the environment.
+# Quote info and historical bars age differently, so they get separate TTLs (seconds).
+INFO_TTL = float(os.environ.get("STOCK_INFO_TTL", 60))
+HISTORY_TTL = float(os.environ.get("STOCK_HISTORY_TTL", 300))
+CACHE_SIZE = int(os.environ.get("STOCK_CACHE_SIZE", 256))
+
+# Upper bound on concurrent yfinance info requests made by get_stock_data_many
+INFO_WORKERS = int(os.environ.get("STOCK_INFO_WORKERS", 8))
+
+# get_stock_data requests info and history in parallel and stops waiting after this many
+# seconds; whatever hasn't arrived is replaced by fallback data (and cached once it lands)
+FETCH_TIMEOUT = float(os.environ.get("STOCK_FETCH_TIMEOUT", 10))
+FETCH_WORKERS = int(os.environ.get("STOCK_FETCH_WORKERS", 16))
+
+# Columns kept for every ticker so batch results line up
+HISTORY_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+# Corporate action columns Ticker.history adds to every frame
+ACTION_COLUMNS = ["Dividends", "Stock Splits"]
+
+# Process-wide caches shared by every session: info is keyed by ticker, history by (ticker, period)
+info_cache = TTLCache(maxsize=CACHE_SIZE, ttl=INFO_TTL)
+history_cache = TTLCache(maxsize=CACHE_SIZE, ttl=HISTORY_TTL)
+
+# Shared by every session, so concurrent lookups can't start unbounded threads
+fetch_pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS, thread_name_prefix="stock-fetch")
+
+# Fetches still running, keyed like the caches (tickers for info, (ticker, period) for
+# history), so concurrent callers for the same ticker wait on one request instead of
+# each queueing their own
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def configure_cache(info_ttl=None, history_ttl=None, maxsize=None):
+    """Change cache TTLs (seconds) and/or the maximum number of entries per cache."""
+    if info_ttl is not None:
+        info_cache.ttl = info_ttl
+    if history_ttl is not None:
+        history_cache.ttl = history_ttl
+    if maxsize is not None:
+        info_cache.maxsize = maxsize
+        history_cache.maxsize = maxsize
+
+
+def cache_stats():
+    """Hit/miss counters for the info and history caches."""
+    return {"info": info_cache.stats(), "history": history_cache.stats()}
+
+
+def clear_cache():
+    info_cache.clear()
+    history_cache.clear()
+
+
+def parse_market_cap(market_cap_str):
+    """Convert a market cap string such as "2.67T" or "562.5B" to a number."""
+    if market_cap_str.endswith("T"):
+        return float(market_cap_str.replace("T", "")) * 1_000_000_000_000
+    elif market_cap_str.endswith("B"):
+        return float(market_cap_str.replace("B", "")) * 1_000_000_000
+    elif market_cap_str.endswith("M"):
+        return float(market_cap_str.replace("M", "")) * 1_000_000
+    return None
+
+
+# Parsed once at import instead of on every demo lookup
+DEMO_MARKET_CAPS = {ticker: parse_market_cap(data["market_cap"]) for ticker, data in DEMO_STOCKS.items()}
+
+
+def demo_info(ticker):
+    """Build a yfinance-style info dictionary from DEMO_STOCKS."""
+    demo_data = DEMO_STOCKS[ticker]
+
+    info = {
+        "longName": demo_data["name"],
+        "regularMarketPrice": demo_data["price"],
+        "previousClose": demo_data["price"] - demo_data["change"],
+        "sector": demo_data["sector"],
+        "trailingPE": demo_data["pe_ratio"],
+        "dividendYield": demo_data["dividend_yield"] / 100 if demo_data["dividend_yield"] > 0 else None,
+        "longBusinessSummary": demo_data["description"]
+    }
+
+    market_cap = DEMO_MARKET_CAPS[ticker]
+    if market_cap is not None:
+        info["marketCap"] = market_cap
+
+    return info
+
+
+def demo_history(ticker, period="1mo"):
+    """Generate historical data for a DEMO_STOCKS ticker, ending at its demo price."""
+    demo_data = DEMO_STOCKS[ticker]
+
+    # Slight upward or downward trend based on current change
+    trend = 0.0002 if demo_data["percent_change"] > 0 else -0.0002
+
+    with timer("stock.synthetic"):
+        return generate_history(ticker, period, last_price=demo_data["price"], trend=trend)
+
+
+def fallback_info(ticker):
+    """Info dictionary used when yfinance has nothing useful for a ticker."""
+    return {
+        "longName": ticker,
+        "regularMarketPrice": None,
+        "previousClose": None,
+        "marketCap": None,
+        "sector": "Unknown",
+        "trailingPE": None,
+        "dividendYield": None,
+        "longBusinessSummary": f"Information for {ticker} is currently unavailable."
+    }
+
+
+def simulated_history(ticker, period="1mo"):
+    """
+    Sample historical data used when real history is unavailable.
+    The frame is flagged with ``hist.attrs["simulated"]`` so the UI can say so.
+    """
+    with timer("stock.synthetic"):
+        hist = generate_history(ticker, period, start_price=100)
+    hist.attrs["simulated"] = True
+    return hist
+
+
+def replay_info(ticker):
+    """Recorded quote info, or the placeholder dictionary for tickers never recorded."""
+    info = data_store.store.load_info(ticker)
+    return info if info is not None else fallback_info(ticker)
+
+
+def replay_history(ticker, period="1mo"):
+    """Recorded history, or simulated data for tickers/periods never recorded."""
+    hist = data_store.store.load_history(ticker, period)
+    return hist if hist is not None else simulated_history(ticker, period)
+
+
+def request_info(stock):
+    """Quote info from yfinance; raises if nothing useful comes back."""
+    with timer("stock.info"):
+        info = stock.info
+    if not info or len(info) < 5:  # If we got minimal or no data
+        raise ValueError("Limited data available")
+    return info
+
+
+def fetch_info(stock, ticker):
+    """Quote info from yfinance, falling back to a placeholder dictionary."""
+    try:
+        info = request_info(stock)
+    except Exception:
+        return fallback_info(ticker)
+    if data_store.recording():
+        data_store.store.save_info(ticker, info)
+    return info
+
+
+def fetch_history(stock, ticker, period="1mo"):
+    """Historical bars from yfinance, falling back to simulated data."""
+    try:
+        with timer("stock.history"):
+            hist = stock.history(period=period)
+        if hist.empty:
+            raise ValueError("No historical data")
+    except Exception:
+        return simulated_history(ticker, period)
+    if data_store.recording():
+        data_store.store.save_history(ticker, period, hist)
+    return hist
+
+
+def _fetch_once(cache, key, fetch, *args):
+    """
+    Future for ``fetch(*args)``, shared with any request for ``key`` still in flight.
+    The result is cached under ``key`` when it lands, even if every caller stopped waiting;
+    a fetch that raises isn't cached, so the next request for ``key`` tries again.
+    """
+    with _in_flight_lock:
+        future = _in_flight.get(key)
+        if future is not None:
+            return future
+        # The request may have landed between the caller's cache miss and taking the lock
+        value = cache.get(key)
+        if value is not None:
+            future = Future()
+            future.set_result(value)
+            return future
+        future = fetch_pool.submit(fetch, *args)
+        _in_flight[key] = future
+
+    def done(future):
+        try:
+            if future.exception() is None:
+                cache.set(key, future.result())
+        finally:
+            with _in_flight_lock:
+                _in_flight.pop(key, None)
+
+    # Outside the lock: the callback runs right here if the fetch already finished
+    future.add_done_callback(done)
+    return future
+
+
+def _cached_locally(ticker, period, load_info, load_history):
+    """``(info, hist)`` from the caches, filling them from local loaders on a miss."""
+    info = info_cache.get(ticker)
+    if info is None:
+        info = load_info(ticker)
+        info_cache.set(ticker, info)
+
+    hist = history_cache.get((ticker, period))
+    if hist is None:
+        hist = load_history(ticker, period)
+        history_cache.set((ticker, period), hist)
+
+    return info, hist
+
+
+def get_stock_data(ticker, period="1mo"):
+    """
+    Return ``(stock, info, hist)`` for a ticker, using demo data for DEMO_STOCKS.
+
+    With ``DATA_MODE=replay`` every other ticker is read from the data store and ``stock``
+    is ``"replay"``; nothing goes over the network.
+
+    Results are served from the process-wide caches while fresh, so repeated views of
+    the same ticker skip both the network round trip and the synthetic generation.
+    For other tickers info and history are requested in parallel; after ``FETCH_TIMEOUT``
+    seconds the missing part is replaced by fallback data for this call.
+    The returned objects are shared between callers and must not be modified.
+    """
+    ticker = ticker.upper()
+
+    # Check if we have demo data for this ticker
+    if ticker in DEMO_STOCKS:
+        return "demo", *_cached_locally(ticker, period, demo_info, demo_history)
+
+    if data_store.replaying():
+        return "replay", *_cached_locally(ticker, period, replay_info, replay_history)
+
+    # If not in demo data, try to get real data
+    stock = yf.Ticker(ticker)
+
+    info = info_cache.get(ticker)
+    hist = history_cache.get((ticker, period))
+    if info is not None and hist is not None:
+        return stock, info, hist
+
+    # Request whatever is missing concurrently, joining requests other callers already made
+    futures = {}
+    if info is None:
+        futures["info"] = _fetch_once(info_cache, ticker, fetch_info, stock, ticker)
+    if hist is None:
+        futures["hist"] = _fetch_once(history_cache, (ticker, period), fetch_history, stock, ticker, period)
+
+    done, _ = wait(futures.values(), timeout=FETCH_TIMEOUT)
+
+    def landed(future):
+        return future in done and future.exception() is None
+
+    if "info" in futures:
+        info = futures["info"].result() if landed(futures["info"]) else fallback_info(ticker)
+    if "hist" in futures:
+        hist = futures["hist"].result() if landed(futures["hist"]) else simulated_history(ticker, period)
+
+    return stock, info, hist
+
+
+def _info_or_error(ticker):
+    try:
+        info = request_info(yf.Ticker(ticker))
+    except Exception as e:
+        return fallback_info(ticker), str(e) or type(e).__name__
+    if data_store.recording():
+        data_store.store.save_info(ticker, info)
+    return info, None
+
+
+def _download_histories(tickers, period):
+    """
+    Bulk-download history for several tickers; returns ({ticker: frame}, {ticker: error}).
+    Frames are shaped like ``Ticker.history``'s (adjusted prices, corporate action columns,
+    timezone-aware dates), since both end up in history_cache under the same keys.
+    """
+    frames, errors = {}, {}
+    try:
+        with timer("stock.download"):
+            data = yf.download(tickers, period=period, group_by="ticker", auto_adjust=True, actions=True,
+                               ignore_tz=False, threads=True, progress=False)
+    except Exception as e:
+        return frames, {ticker: str(e) for ticker in tickers}
+
+    # A ticker failed when its columns are missing from the result or hold nothing but NaN
+    for ticker in tickers:
+        if isinstance(data.columns, pd.MultiIndex):
+            if ticker not in data.columns.get_level_values(0):
+                errors[ticker] = "No data returned"
+                continue
+            hist = data[ticker]
+        else:
+            hist = data  # yfinance returns a flat frame for a single ticker
+        hist = hist.dropna(how="all")
+        if hist.empty:
+            errors[ticker] = "No historical data"
+        else:
+            # Only present when some ticker in the batch had a dividend or split
+            frames[ticker] = hist.assign(**{column: 0.0 for column in ACTION_COLUMNS if column not in hist.columns})
+    return frames, errors
+
+
+def get_stock_data_many(tickers, period="1mo"):
+    """
+    Fetch several tickers at once.
+
+    History for non-demo tickers comes from one bulk ``yf.download`` call and info from a
+    bounded thread pool; DEMO_STOCKS and anything still in the caches are served locally.
+    Nothing is shown in the UI; failures are reported per ticker instead. With
+    ``DATA_MODE=replay`` every ticker is served from the data store.
+
+    Returns ``(hist, infos, errors)``: ``hist`` has ``(ticker, field)`` MultiIndex columns on
+    one shared date index, ``infos`` maps each ticker to its info dictionary and ``errors``
+    maps tickers that fell back to placeholder or simulated data to a message.
+    """
+    tickers = list(dict.fromkeys(ticker.upper() for ticker in tickers))
+    frames, infos, errors = {}, {}, {}
+    missing_info, missing_hist = [], []
+
+    for ticker in tickers:
+        if ticker in DEMO_STOCKS or data_store.replaying():
+            _, infos[ticker], frames[ticker] = get_stock_data(ticker, period)
+            continue
+
+        info = info_cache.get(ticker)
+        if info is None:
+            missing_info.append(ticker)
+        else:
+            infos[ticker] = info
+
+        hist = history_cache.get((ticker, period))
+        if hist is None:
+            missing_hist.append(ticker)
+        else:
+            frames[ticker] = hist
+
+    if missing_info:
+        with ThreadPoolExecutor(max_workers=min(INFO_WORKERS, len(missing_info))) as pool:
+            for ticker, (info, error) in zip(missing_info, pool.map(_info_or_error, missing_info)):
+                infos[ticker] = info
+                info_cache.set(ticker, info)
+                if error:
+                    errors[ticker] = f"info: {error}"
+
+    if missing_hist:
+        downloaded, failed = _download_histories(missing_hist, period)
+        for ticker in missing_hist:
+            if ticker in downloaded:
+                hist = downloaded[ticker]
+                if data_store.recording():
+                    data_store.store.save_history(ticker, period, hist)
+            else:
+                hist = simulated_history(ticker, period)
+                errors[ticker] = "; ".join(filter(None, [errors.get(ticker), f"history: {failed[ticker]}"]))
+            history_cache.set((ticker, period), hist)
+            frames[ticker] = hist
+
+    aligned = []
+    for ticker in tickers:
+        if frames[ticker].attrs.get("simulated") and "history:" not in errors.get(ticker, ""):
+            # Simulated history served from the cache (or an unrecorded replay) is still a fallback
+            errors[ticker] = "; ".join(filter(None, [errors.get(ticker), "history: simulated data"]))
+        hist = frames[ticker][[c for c in HISTORY_COLUMNS if c in frames[ticker].columns]]
+        if getattr(hist.index, "tz", None) is not None:
+            # Mixing exchange timezones with naive demo dates would break alignment
+            hist = hist.tz_localize(None)
+        aligned.append(hist)
+
+    hist = pd.concat(aligned, axis=1, keys=tickers, names=["Ticker", "Price"]) if aligned else pd.DataFrame()
+    return hist, infos, errors
@@ -0,0 +1,320 @@
+import os
+import random
+import threading
+import time
+from urllib.parse import quote_plus
+
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+
+import data_store
+from instrumentation import timer
+from ttl_cache import TTLCache
+
+# Base URL for Yahoo Finance (point it at a local server to test without the network)
+BASE_URL = os.environ.get("YAHOO_FINANCE_URL", "https://finance.yahoo.com")
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+# (connect, read) timeouts in seconds, so a slow page can't hang a session
+TIMEOUT = (
+    float(os.environ.get("NEWS_CONNECT_TIMEOUT", 3.05)),
+    float(os.environ.get("NEWS_READ_TIMEOUT", 10)),
+)
+MAX_RETRIES = int(os.environ.get("NEWS_MAX_RETRIES", 2))
+BACKOFF = 0.5  # seconds, doubled on every retry and jittered
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Validators and parsed articles of the last successful response per URL, for conditional GETs
+revalidation_cache = TTLCache(maxsize=256, ttl=24 * 60 * 60)
+
+# lxml is noticeably faster than the built-in parser; use it when it is installed
+try:
+    import lxml  # noqa: F401
+    PARSER = "lxml"
+except ImportError:
+    PARSER = "html.parser"
+
+MAX_ARTICLES = 10
+
+# Classes of the elements that hold articles on Yahoo Finance pages
+CANDIDATE_CLASSES = {"js-stream-content", "Ov(h)", "Cf", "NewsArticle", "StretchedBox"}
+
+# Shown when no live articles can be fetched
+DEMO_ARTICLES = [
+    {
+        "title": "Markets Rally as Fed Signals Potential Rate Cuts",
+        "link": "https://finance.yahoo.com/news/markets-rally-fed-signals-potential-rate-cuts",
+        "source": "Yahoo Finance"
+    },
+    {
+        "title": "Tech Stocks Lead Market Gains Amid AI Optimism",
+        "link": "https://finance.yahoo.com/news/tech-stocks-lead-market-gains-ai-optimism",
+        "source": "Reuters"
+    },
+    {
+        "title": "Oil Prices Stabilize After Recent Volatility",
+        "link": "https://finance.yahoo.com/news/oil-prices-stabilize-recent-volatility",
+        "source": "Bloomberg"
+    },
+    {
+        "title": "Retail Sales Exceed Expectations in Latest Report",
+        "link": "https://finance.yahoo.com/news/retail-sales-exceed-expectations-latest-report",
+        "source": "CNBC"
+    },
+    {
+        "title": "Housing Market Shows Signs of Cooling as Mortgage Rates Rise",
+        "link": "https://finance.yahoo.com/news/housing-market-shows-signs-cooling-mortgage-rates-rise",
+        "source": "Wall Street Journal"
+    }
+]
+
+
+def demo_articles(query=None):
+    """Demo articles for ``query``: a few on its topic followed by general market news."""
+    if not query:
+        return list(DEMO_ARTICLES)
+
+    search_term = query.lower()
+    if "crypto" in search_term or "bitcoin" in search_term:
+        topical = [
+            {
+                "title": "Bitcoin Surges Past $60,000 Amid Growing Institutional Interest",
+                "link": "https://finance.yahoo.com/news/bitcoin-surges-past-60000",
+                "source": "CoinDesk"
+            },
+            {
+                "title": "Cryptocurrency Market Cap Exceeds $2 Trillion as Adoption Grows",
+                "link": "https://finance.yahoo.com/news/crypto-market-cap-exceeds-2-trillion",
+                "source": "Bloomberg"
+            },
+            {
+                "title": "Regulators Consider New Framework for Cryptocurrency Oversight",
+                "link": "https://finance.yahoo.com/news/regulators-consider-new-framework-crypto",
+                "source": "Wall Street Journal"
+            }
+        ]
+    elif "stock" in search_term or "market" in search_term:
+        topical = [
+            {
+                "title": "Stock Market Outlook: Analysts Predict Continued Growth Through Q4",
+                "link": "https://finance.yahoo.com/news/stock-market-outlook-q4",
+                "source": "Barron's"
+            },
+            {
+                "title": "Market Volatility Increases as Earnings Season Approaches",
+                "link": "https://finance.yahoo.com/news/market-volatility-increases",
+                "source": "CNBC"
+            },
+            {
+                "title": "Small-Cap Stocks Outperform as Economic Recovery Accelerates",
+                "link": "https://finance.yahoo.com/news/small-cap-stocks-outperform",
+                "source": "Motley Fool"
+            }
+        ]
+    else:
+        # Generic search results with the query term included
+        slug = search_term.replace(' ', '-')
+        topical = [
+            {
+                "title": f"Latest Developments in {query.title()} Market Show Promising Trends",
+                "link": f"https://finance.yahoo.com/news/{slug}-market-trends",
+                "source": "Yahoo Finance"
+            },
+            {
+                "title": f"Investors Eye {query.title()} Sector for Growth Opportunities",
+                "link": f"https://finance.yahoo.com/news/investors-eye-{slug}-sector",
+                "source": "Reuters"
+            },
+            {
+                "title": f"Analysis: How {query.title()} Is Reshaping the Financial Landscape",
+                "link": f"https://finance.yahoo.com/news/analysis-{slug}-reshaping-finance",
+                "source": "Bloomberg"
+            }
+        ]
+    return topical + DEMO_ARTICLES[:2]
+
+
+_session = None
+_session_lock = threading.Lock()
+_jitter = random.Random()  # private instance so backoff never touches the global random state
+
+
+class NewsFetchError(Exception):
+    """The news page answered with an unusable HTTP status."""
+
+
+def get_session():
+    """Process-wide pooled session, so repeat fetches reuse the TCP/TLS connection."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update(HEADERS)
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+@timer("news.fetch")
+def request_page(url, headers=None):
+    """GET ``url`` with timeouts, retrying connection errors and retryable statuses."""
+    session = get_session()
+    for attempt in range(MAX_RETRIES + 1):
+        try:
+            response = session.get(url, headers=headers, timeout=TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = e
+        else:
+            if response.status_code not in RETRY_STATUSES:
+                return response
+            error = NewsFetchError(f"HTTP {response.status_code}")
+
+        if attempt < MAX_RETRIES:
+            time.sleep(BACKOFF * 2 ** attempt * _jitter.uniform(0.5, 1.5))
+    raise error
+
+
+def news_url(query=None, base_url=BASE_URL):
+    # If query is provided, search for specific news; otherwise use the main page
+    if query:
+        return f"{base_url}/search?q={quote_plus(query)}"
+    return base_url
+
+
+def fetch_news(query=None, base_url=BASE_URL):
+    """
+    Fetch and parse news articles for ``query`` (or the front page).
+
+    Pages are revalidated with ETag/If-Modified-Since; on a 304 the previously parsed
+    articles are returned without downloading or parsing anything. With ``DATA_MODE=replay``
+    the recorded page is parsed instead (no articles if it was never recorded), and with
+    ``DATA_MODE=record`` every page downloaded is saved.
+    """
+    # Pages are stored by path, so a recording replays against any base URL
+    page_key = news_url(query, "") or "/"
+    if data_store.replaying():
+        html = data_store.store.load_page(page_key)
+        return parse_articles(html, base_url) if html is not None else []
+
+    url = news_url(query, base_url)
+    cached = revalidation_cache.get(url)
+
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    response = request_page(url, headers=headers)
+
+    if response.status_code == 304 and cached:
+        return cached["articles"]
+
+    # Check if the request was successful
+    if response.status_code != 200:
+        raise NewsFetchError(f"HTTP {response.status_code}")
+
+    if data_store.recording():
+        data_store.store.save_page(page_key, response.content)
+
+    articles = parse_articles(response.content, base_url)
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        revalidation_cache.set(url, {"etag": etag, "last_modified": last_modified, "articles": articles})
+
+    return articles
+
+
+def get_news(query=None, limit=MAX_ARTICLES):
+    """
+    Return ``(articles, demo)``: live articles when there are any, otherwise demo
+    articles for the query with ``demo`` set. NewsFetchError propagates to the caller.
+    """
+    articles = fetch_news(query)
+    if not articles:
+        return demo_articles(query)[:limit], True
+    return articles[:limit], False
+
+
+def _is_candidate_class(class_value):
+    return class_value is not None and not CANDIDATE_CLASSES.isdisjoint(class_value.split())
+
+
+def _normalize_title(title):
+    return " ".join(title.split()).casefold()
+
+
+@timer("news.parse")
+def parse_articles(html, base_url=BASE_URL, limit=MAX_ARTICLES):
+    """
+    Extract up to ``limit`` ``{'title', 'link', 'source'}`` articles from a Yahoo Finance page.
+
+    Only the known article containers are built into a tree (via a SoupStrainer); the
+    whole page is parsed only when none of them are present. Extraction stops as soon
+    as ``limit`` articles have been collected.
+    """
+    # Parse just the candidate containers
+    soup = BeautifulSoup(html, PARSER, parse_only=SoupStrainer(["li", "div"], class_=_is_candidate_class))
+
+    # Look for different possible article containers
+    news_items = soup.select('li.js-stream-content, div.Ov\\(h\\), div.Cf')
+
+    if not news_items:
+        # Try alternative selectors if the first ones don't work
+        news_items = soup.select('div.NewsArticle, div.StretchedBox')
+
+    # If still no results, try a more generic approach
+    if not news_items:
+        # Look for any div with a title and link that might be a news item
+        soup = BeautifulSoup(html, PARSER)
+        news_items = (
+            div for div in soup.find_all('div', class_=True)
+            if div.find('a') and (div.find('h3') or div.find('h4'))
+        )
+
+    articles = []
+    seen_titles = set()
+
+    # Process found items
+    for item in news_items:
+        # Try to extract title, link, and source
+        title_tag = item.select_one('h3, h4, a.js-content-viewer')
+        link_tag = item.select_one('a[href]')
+
+        if title_tag and link_tag:
+            title = title_tag.text.strip()
+            link = link_tag.get('href')
+
+            # Only add if we have a title and it's not a duplicate
+            key = _normalize_title(title)
+            if not title or key in seen_titles:
+                continue
+            seen_titles.add(key)
+
+            # Make sure link is absolute
+            if link.startswith('/'):
+                link = base_url + link
+
+            # Find source/publisher if available
+            source_tag = item.select_one('span.provider-name')
+            source = source_tag.text.strip() if source_tag else "Yahoo Finance"
+
+            articles.append({
+                'title': title,
+                'link': link,
+                'source': source
+            })
+            if len(articles) >= limit:
+                break
+
+    return articles
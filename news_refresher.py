@@ -0,0 +1,182 @@
+import os
+import threading
+import time
+from collections import Counter
+
+import news
+from ttl_cache import TTLCache
+
+# Seconds between refreshes, and how many of the most searched queries to keep warm
+REFRESH_INTERVAL = float(os.environ.get("NEWS_REFRESH_INTERVAL", 300))
+POPULAR_QUERIES = int(os.environ.get("NEWS_POPULAR_QUERIES", 5))
+
+# Queries kept in the store; articles nobody searches for anymore expire after NEWS_STORE_TTL
+STORE_SIZE = int(os.environ.get("NEWS_STORE_SIZE", 64))
+STORE_TTL = float(os.environ.get("NEWS_STORE_TTL", 3600))
+
+# Failed fetches of a new query are retried this many times before it is given up on;
+# searching again for a given-up query only retries it after REFRESH_INTERVAL
+MAX_ATTEMPTS = int(os.environ.get("NEWS_MAX_ATTEMPTS", 3))
+
+
+def _key(query):
+    # The front page is stored under None; queries are matched case-insensitively
+    query = (query or "").strip().lower()
+    return query or None
+
+
+class NewsStore:
+    """Parsed articles per query, shared by every session in the process."""
+
+    def __init__(self, size=STORE_SIZE, ttl=STORE_TTL, interval=REFRESH_INTERVAL):
+        self._lock = threading.Lock()
+        self._articles = TTLCache(maxsize=size, ttl=ttl)
+        self._query_counts = Counter()
+        self._pending = {}  # query -> failed attempts so far
+        self._failed = TTLCache(maxsize=size, ttl=interval)
+        self.size = size
+        self.last_refresh = None
+        self.last_error = None
+
+    def get(self, query=None):
+        """Return ``(articles, fetched_at)``, or ``(None, None)`` if the query hasn't been fetched yet."""
+        return self._articles.get(_key(query), (None, None))
+
+    def put(self, query, articles):
+        key = _key(query)
+        self._articles.set(key, (articles, time.time()))
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def record_query(self, query):
+        """
+        Count a search; queries not fetched yet are queued for the next refresh.
+        Returns True while the query is waiting to be fetched.
+        """
+        key = _key(query)
+        with self._lock:
+            if key is not None:
+                self._query_counts[key] += 1
+            if key in self._pending:
+                return True
+            if self._articles.get(key) is not None or self._failed.get(key) is not None:
+                return False
+            if len(self._pending) >= self.size:
+                return False
+            self._pending[key] = 0
+            return True
+
+    def is_pending(self, query):
+        with self._lock:
+            return _key(query) in self._pending
+
+    def fetch_failed(self, query):
+        """Count a failed fetch; pending queries are given up on after MAX_ATTEMPTS."""
+        key = _key(query)
+        with self._lock:
+            if key not in self._pending:
+                return
+            self._pending[key] += 1
+            if self._pending[key] >= MAX_ATTEMPTS:
+                del self._pending[key]
+                self._failed.set(key, True)
+
+    def pending_queries(self):
+        with self._lock:
+            return sorted(self._pending, key=str)
+
+    def queries_to_refresh(self, limit=POPULAR_QUERIES):
+        """
+        Front page, the most searched queries and anything requested but not fetched yet.
+        Search counts are halved on every call, so queries stop counting as popular once
+        people stop searching for them.
+        """
+        with self._lock:
+            failed = {key for key, _ in self._failed.items()}
+            popular = [query for query, _ in self._query_counts.most_common() if query not in failed][:limit]
+            self._query_counts = Counter({
+                query: count // 2 for query, count in self._query_counts.most_common(self.size) if count // 2
+            })
+            return list(dict.fromkeys([None] + popular + sorted(self._pending, key=str)))
+
+    def status(self, interval=REFRESH_INTERVAL):
+        """Refresh time, age and staleness of the store, for monitoring."""
+        now = time.time()
+        age = now - self.last_refresh if self.last_refresh else None
+        with self._lock:
+            pending = sorted(key or "(front page)" for key in self._pending)
+        return {
+            "last_refresh": self.last_refresh,
+            "age_seconds": age,
+            "stale": age is None or age > 2 * interval,
+            "last_error": self.last_error,
+            "pending": pending,
+            "given_up": sorted(key or "(front page)" for key, _ in self._failed.items()),
+            "entries": {
+                key or "(front page)": {"articles": len(articles), "age_seconds": now - fetched_at}
+                for key, (articles, fetched_at) in self._articles.items()
+            },
+        }
+
+
+class NewsRefresher(threading.Thread):
+    """
+    Daemon thread that keeps the store filled so pages never scrape on their own.
+    Every ``interval`` it refreshes the front page, popular and pending queries; in between,
+    request_refresh() fetches just the pending ones.
+    """
+
+    def __init__(self, store, interval=REFRESH_INTERVAL):
+        super().__init__(name="news-refresher", daemon=True)
+        self.store = store
+        self.interval = interval
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+    def refresh_once(self, full=True):
+        queries = self.store.queries_to_refresh() if full else self.store.pending_queries()
+        errors = []
+        for query in queries:
+            try:
+                self.store.put(query, news.fetch_news(query))
+            except Exception as e:
+                self.store.fetch_failed(query)
+                errors.append(f"{query or '(front page)'}: {e}")
+        if full or errors:
+            self.store.last_error = "; ".join(errors) or None
+        if full:
+            self.store.last_refresh = time.time()
+
+    def request_refresh(self):
+        """Fetch pending queries now instead of waiting for the next interval (e.g. for a new query)."""
+        self._wake.set()
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def run(self):
+        next_full = time.monotonic()
+        while not self._stopped.is_set():
+            full = time.monotonic() >= next_full
+            self.refresh_once(full)
+            if full:
+                next_full = time.monotonic() + self.interval
+            self._wake.wait(max(next_full - time.monotonic(), 0))
+            self._wake.clear()
+
+
+store = NewsStore()
+
+_refresher = None
+_refresher_lock = threading.Lock()
+
+
+def start_refresher(interval=REFRESH_INTERVAL):
+    """Start the process-wide refresher once; later calls return the running instance."""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None or not _refresher.is_alive():
+            _refresher = NewsRefresher(store, interval)
+            _refresher.start()
+        return _refresher
@@ -0,0 +1,221 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import market_data
+from ttl_cache import TTLCache
+
+# Columns of a lots table: cost is per share; lots without a date (or dated before the
+# history window) count as held from the first bar
+LOT_COLUMNS = ["ticker", "shares", "cost", "date"]
+
+# Price matrices live as long as the histories they are built from; valuations are
+# cached per (lots, period) so a rerun with one revised bar only values that bar
+price_cache = TTLCache(maxsize=64, ttl=market_data.HISTORY_TTL)
+valuation_cache = TTLCache(
+    maxsize=int(os.environ.get("PORTFOLIO_CACHE_SIZE", 64)),
+    ttl=float(os.environ.get("PORTFOLIO_CACHE_TTL", 3600)),
+)
+
+
+class Valuation:
+    """
+    A portfolio valued over an aligned price matrix.
+
+    ``holdings`` and ``invested`` are (dates x tickers) arrays of shares held and cost paid in
+    so far; ``equity`` and ``cost_basis`` are their totals per date. ``positions`` values the
+    latest bar per ticker and ``totals`` sums it.
+    """
+
+    def __init__(self, prices, holdings, invested, equity, cost_basis):
+        self.prices = prices
+        self.holdings = holdings
+        self.invested = invested
+        self.equity = equity
+        self.cost_basis = cost_basis
+        self.positions, self.totals = _latest(prices, holdings, invested, equity, cost_basis)
+
+    def curve(self):
+        """Daily value, cost basis and P&L (value change minus money added) as a DataFrame."""
+        index = self.prices.index
+        pnl = np.diff(self.equity, prepend=np.nan) - np.diff(self.cost_basis, prepend=np.nan)
+        return pd.DataFrame({"Value": self.equity, "Cost Basis": self.cost_basis, "Daily P&L": pnl}, index=index)
+
+
+def make_lots(lots):
+    """A lots table from a DataFrame or records: upper-case tickers, float shares/cost, naive dates."""
+    lots = pd.DataFrame(lots).rename(columns=str.lower).reindex(columns=LOT_COLUMNS)
+    lots["ticker"] = lots["ticker"].astype(str).str.strip().str.upper()
+    lots["shares"] = pd.to_numeric(lots["shares"], errors="coerce")
+    lots["cost"] = pd.to_numeric(lots["cost"], errors="coerce")
+    lots["date"] = pd.to_datetime(lots["date"], errors="coerce")
+    lots = lots[(lots["ticker"] != "") & (lots["ticker"] != "NAN") & (lots["ticker"] != "NONE")]
+    return lots.dropna(subset=["shares", "cost"]).reset_index(drop=True)
+
+
+def _lots_key(lots):
+    return tuple(lots.itertuples(index=False, name=None))
+
+
+def price_matrix(tickers, period="1y"):
+    """
+    Closing prices as one (dates x tickers) frame on a shared date index, plus the tickers
+    whose history fell back to simulated data. Gaps (e.g. weekends for exchange-traded
+    tickers next to daily demo data) are carried forward, and back from each ticker's first bar.
+    """
+    tickers = tuple(dict.fromkeys(ticker.upper() for ticker in tickers))
+    cached = price_cache.get((tickers, period))
+    if cached is not None:
+        return cached
+
+    hist, _, errors = market_data.get_stock_data_many(tickers, period)
+    # Failed info requests don't matter here as long as real prices arrived
+    simulated = sorted(ticker for ticker, error in errors.items() if "history:" in error)
+    if hist.empty:
+        prices = pd.DataFrame(columns=list(tickers), dtype=float)
+    else:
+        prices = hist.xs("Close", axis=1, level="Price").reindex(columns=list(tickers)).ffill().bfill()
+    price_cache.set((tickers, period), (prices, simulated))
+    return prices, simulated
+
+
+def _added(lots, index, columns, start=0):
+    """Shares and cost added per (date, ticker) for the lots landing on row ``start`` or later."""
+    if index.empty:
+        return np.zeros((0, len(columns))), np.zeros((0, len(columns)))
+    rows = np.searchsorted(index.values, lots["date"].fillna(index[0]).values.astype(index.values.dtype))
+    # Lots newer than the last bar are already held at the latest price
+    rows = np.minimum(rows, len(index) - 1)
+    cols = columns.get_indexer(lots["ticker"])
+    keep = (rows >= start) & (cols >= 0)
+
+    shares = np.zeros((len(index) - start, len(columns)))
+    cost = np.zeros_like(shares)
+    np.add.at(shares, (rows[keep] - start, cols[keep]), lots["shares"].to_numpy()[keep])
+    np.add.at(cost, (rows[keep] - start, cols[keep]), (lots["shares"] * lots["cost"]).to_numpy()[keep])
+    return shares, cost
+
+
+def value_portfolio(lots, prices):
+    """Value ``lots`` over every bar of ``prices`` (from price_matrix) in one pass."""
+    shares, cost = _added(lots, prices.index, prices.columns)
+    holdings = np.cumsum(shares, axis=0)
+    invested = np.cumsum(cost, axis=0)
+    values = prices.to_numpy(dtype=float)
+    return Valuation(prices, holdings, invested, (values * holdings).sum(axis=1), invested.sum(axis=1))
+
+
+def extend_valuation(lots, prices, previous, rows, offset=0):
+    """
+    Reuse bars ``offset`` to ``offset + rows`` of ``previous`` as the first ``rows`` bars and
+    value only the bars after them. Holdings are cumulative, so lots dated before a window
+    that slid forward are already in the reused rows, just as a full valuation counts them
+    from the first bar.
+    """
+    shares, cost = _added(lots, prices.index, prices.columns, start=rows)
+    reused = slice(offset, offset + rows)
+    holdings = previous.holdings[offset + rows - 1] + np.cumsum(shares, axis=0)
+    invested = previous.invested[offset + rows - 1] + np.cumsum(cost, axis=0)
+    values = prices.to_numpy(dtype=float)[rows:]
+    return Valuation(
+        prices,
+        np.concatenate([previous.holdings[reused], holdings]),
+        np.concatenate([previous.invested[reused], invested]),
+        np.concatenate([previous.equity[reused], (values * holdings).sum(axis=1)]),
+        np.concatenate([previous.cost_basis[reused], invested.sum(axis=1)]),
+    )
+
+
+def _reusable_rows(previous_prices, prices):
+    """
+    ``(offset, rows)`` when the first ``rows`` bars of ``prices`` are bars ``offset`` onwards
+    of ``previous_prices`` and valued in its result: the shared bars minus the latest one,
+    which may have been revised. ``offset`` is how far the window slid forward. None when
+    the tickers or dates differ, or the first or last reused bar changed (a slid window's
+    first bar can be back-filled where the old one was carried forward).
+    """
+    if not prices.columns.equals(previous_prices.columns) or prices.empty or previous_prices.empty:
+        return None
+    offset = previous_prices.index.searchsorted(prices.index[0])
+    if offset >= len(previous_prices) or previous_prices.index[offset] != prices.index[0]:
+        return None
+    shared = len(previous_prices) - offset
+    if shared > len(prices) or not prices.index[:shared].equals(previous_prices.index[offset:]):
+        return None
+    rows = shared - 1
+    if rows <= 0:
+        return None
+    for row in {0, rows - 1}:
+        if not np.array_equal(prices.iloc[row].to_numpy(), previous_prices.iloc[offset + row].to_numpy(),
+                              equal_nan=True):
+            return None
+    return offset, rows
+
+
+def get_valuation(lots, period="1y"):
+    """
+    Valuation of ``lots`` over ``period``, plus the tickers priced from simulated history,
+    cached per (lots, period).
+    When the price matrix only gained bars, slid forward or had its latest bar revised,
+    only the new or revised bars are valued again.
+    """
+    lots = make_lots(lots)
+    prices, simulated = price_matrix(lots["ticker"].unique(), period)
+    key = (_lots_key(lots), period)
+    cached = valuation_cache.get(key)
+
+    if cached is not None:
+        if cached.prices is prices:
+            return cached, simulated
+        reusable = _reusable_rows(cached.prices, prices)
+        if reusable is not None:
+            offset, rows = reusable
+            valuation = extend_valuation(lots, prices, cached, rows, offset)
+            valuation_cache.set(key, valuation)
+            return valuation, simulated
+
+    valuation = value_portfolio(lots, prices)
+    valuation_cache.set(key, valuation)
+    return valuation, simulated
+
+
+def _latest(prices, holdings, invested, equity, cost_basis):
+    """Per-ticker valuation at the latest bar, and its totals."""
+    columns = ["shares", "avg_cost", "cost_basis", "price", "market_value", "day_pnl",
+               "unrealized_pnl", "unrealized_pct", "weight"]
+    if prices.empty:
+        return pd.DataFrame(columns=columns, dtype=float), {
+            "market_value": 0.0, "cost_basis": 0.0, "day_pnl": 0.0, "unrealized_pnl": 0.0, "unrealized_pct": None}
+
+    values = prices.to_numpy(dtype=float)
+    shares, cost = holdings[-1], invested[-1]
+    market_value = values[-1] * shares
+    if len(prices) > 1:
+        # Today's change on what was held yesterday, plus new lots against what they cost
+        day_pnl = market_value - values[-2] * holdings[-2] - (cost - invested[-2])
+    else:
+        day_pnl = market_value - cost
+    total = equity[-1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        positions = pd.DataFrame({
+            "shares": shares,
+            "avg_cost": np.where(shares != 0, cost / shares, np.nan),
+            "cost_basis": cost,
+            "price": values[-1],
+            "market_value": market_value,
+            "day_pnl": day_pnl,
+            "unrealized_pnl": market_value - cost,
+            "unrealized_pct": np.where(cost != 0, (market_value - cost) / cost * 100, np.nan),
+            "weight": market_value / total * 100 if total else np.nan,
+        }, index=prices.columns.rename("ticker"))
+
+    totals = {
+        "market_value": float(total),
+        "cost_basis": float(cost_basis[-1]),
+        "day_pnl": float(day_pnl.sum()),
+        "unrealized_pnl": float(total - cost_basis[-1]),
+        "unrealized_pct": float((total - cost_basis[-1]) / cost_basis[-1] * 100) if cost_basis[-1] else None,
+    }
+    return positions, totals
@@ -1,24 +1,43 @@
-import nltk
 import sys
 
-def download_nltk_resources():
+# Required NLTK resources, with the path each one is stored under in an nltk_data directory.
+# Tokenizing skips sentence splitting, so punkt isn't needed.
+RESOURCES = {
+    'stopwords': 'corpora/stopwords/',
+    'wordnet': 'corpora/wordnet/'
+}
+
+def missing_resources(resources=None):
+    """Names of required resources not installed locally. Never touches the network."""
+    import nltk
+
+    resources = resources or list(RESOURCES)
+    missing = []
+    for resource in resources:
+        # Searches every nltk_data directory, unpacked or zipped
+        try:
+            nltk.data.find(RESOURCES[resource])
+        except LookupError:
+            missing.append(resource)
+    return missing
+
+def download_nltk_resources(resources=None):
     """Download required NLTK resources."""
-    resources = [
-        'punkt',
-        'stopwords',
-        'wordnet'
-    ]
-    
+    import nltk
+
+    resources = resources or list(RESOURCES)
+
     print("Downloading NLTK resources...")
     for resource in resources:
         try:
             print(f"Downloading {resource}...")
-            nltk.download(resource)
+            if not nltk.download(resource):
+                raise RuntimeError("download failed")
             print(f"Successfully downloaded {resource}")
         except Exception as e:
             print(f"Error downloading {resource}: {e}", file=sys.stderr)
             return False
-    
+
     print("All NLTK resources downloaded successfully!")
     return True
 
@@ -0,0 +1,107 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Calendar days covered by each yfinance-style period ("ytd" is computed from the date)
+PERIOD_DAYS = {
+    "1d": 1,
+    "5d": 5,
+    "1mo": 30,
+    "3mo": 90,
+    "6mo": 180,
+    "1y": 365,
+    "2y": 730,
+    "5y": 1825,
+    "10y": 3650,
+    "max": 10950,  # 30 years of history is plenty for a simulation
+}
+
+# yfinance interval names mapped to pandas frequencies
+INTERVALS = {
+    "1m": "1min",
+    "2m": "2min",
+    "5m": "5min",
+    "15m": "15min",
+    "30m": "30min",
+    "60m": "60min",
+    "90m": "90min",
+    "1h": "60min",
+    "1d": "1D",
+    "5d": "5D",
+    "1wk": "7D",
+}
+
+
+def stable_seed(*parts):
+    """
+    Seed derived from a digest of ``parts``.
+    Unlike ``hash()``, this is the same in every process, so every worker generates the same data.
+    """
+    key = "|".join(str(part) for part in parts).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def period_days(period, today=None):
+    if period == "ytd":
+        today = today or pd.Timestamp.now().normalize()
+        return max((today - today.replace(month=1, day=1)).days, 1)
+    return PERIOD_DAYS.get(period, 30)
+
+
+def history_index(period="1mo", interval="1d"):
+    """Timestamps for a period, ending at the latest complete bar of the given interval."""
+    freq = pd.Timedelta(INTERVALS.get(interval, "1D"))
+    today = pd.Timestamp.now().normalize()
+    # Daily (and longer) bars end today; intraday bars end at the last finished bar
+    end = today if freq >= pd.Timedelta("1D") else pd.Timestamp.now().floor(freq)
+    start = today - pd.Timedelta(days=period_days(period, today))
+    return pd.date_range(start=start, end=end, freq=freq)
+
+
+def generate_history(ticker, period="1mo", interval="1d", last_price=None, start_price=100.0,
+                     trend=0.0, volatility=0.02, spread=0.02):
+    """
+    Generate a synthetic OHLCV frame for ``ticker``.
+
+    If ``last_price`` is given the walk ends at that price (working backwards from today),
+    otherwise it starts at ``start_price``. ``trend`` and ``volatility`` are per-day figures and
+    are scaled down for intraday bars.
+
+    Every column comes from its own generator seeded by the ticker and interval, and values are
+    drawn newest bar first, so the data is identical across processes and, when anchored at
+    ``last_price``, a shorter period is exactly the tail of a longer one.
+    """
+    index = history_index(period, interval)
+    n = len(index)
+
+    # Scale daily drift/volatility to the bar size
+    bar_days = pd.Timedelta(INTERVALS.get(interval, "1D")) / pd.Timedelta("1D")
+    trend = trend * bar_days
+    volatility = volatility * np.sqrt(bar_days)
+
+    change_rng, high_rng, low_rng, volume_rng = [
+        np.random.default_rng(seq)
+        for seq in np.random.SeedSequence(stable_seed(ticker, interval)).spawn(4)
+    ]
+
+    # Random bar-to-bar changes, newest first
+    changes = change_rng.uniform(-volatility, volatility, n - 1) + trend
+
+    prices = np.empty(n)
+    if last_price is not None:
+        # Start with the current price and work backwards
+        prices[-1] = last_price
+        prices[-2::-1] = last_price / np.cumprod(1 + changes)
+    else:
+        # Walk forward from the starting price
+        prices[0] = start_price
+        prices[1:] = start_price * np.cumprod(1 + changes[::-1])
+
+    return pd.DataFrame({
+        'Open': prices,
+        'High': prices * high_rng.uniform(1, 1 + spread, n)[::-1],
+        'Low': prices * low_rng.uniform(1 - spread, 1, n)[::-1],
+        'Close': prices,
+        'Volume': volume_rng.integers(1_000_000, 10_000_000, n, endpoint=True)[::-1]
+    }, index=index)
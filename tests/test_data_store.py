@@ -0,0 +1,16 @@
+import pytest
+
+import data_store
+from synthetic_data import generate_history
+
+
+def test_parquet_recording_without_pyarrow_is_an_error(tmp_path, monkeypatch):
+    pytest.importorskip("pyarrow")
+    store = data_store.DataStore(str(tmp_path))
+    monkeypatch.setattr(data_store, "HISTORY_FORMAT", "parquet")
+    store.save_history("TEST", "1mo", generate_history("TEST", "1mo"))
+
+    monkeypatch.setattr(data_store, "HISTORY_FORMAT", "csv.gz")
+    with pytest.raises(RuntimeError, match="install pyarrow"):
+        store.load_history("TEST", "1mo")
+    assert store.load_history("OTHER", "1mo") is None
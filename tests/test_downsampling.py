@@ -0,0 +1,17 @@
+import numpy as np
+
+from downsampling import minmax_indices
+
+
+def test_minmax_skips_buckets_inside_a_gap():
+    y = np.sin(np.linspace(0, 20, 1000))
+    y[300:500] = np.nan  # several whole buckets of 10 points
+
+    positions = minmax_indices(y, 200)
+    assert positions[0] == 0 and positions[-1] == 999
+    assert not np.isnan(y[positions[1:-1]]).any()
+    assert y[positions].max() == np.nanmax(y) and y[positions].min() == np.nanmin(y)
+
+
+def test_minmax_all_nan():
+    assert list(minmax_indices(np.full(100, np.nan), 10)) == [0, 99]
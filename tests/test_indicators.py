@@ -0,0 +1,41 @@
+import pandas as pd
+
+import indicators
+from synthetic_data import generate_history
+
+
+def assert_matches_full_recompute(result, hist):
+    expected = indicators.compute_indicators(hist)
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-9, atol=1e-9)
+
+
+def test_appended_bars_match_full_recompute():
+    indicators.indicator_cache.clear()
+    hist = generate_history("TEST", "1y", last_price=100)
+    indicators.get_indicators("TEST", "1y", hist.iloc[:-5])
+
+    assert_matches_full_recompute(indicators.get_indicators("TEST", "1y", hist), hist)
+
+
+def test_sliding_window_reuses_shared_bars():
+    indicators.indicator_cache.clear()
+    hist = generate_history("TEST", "2y", last_price=100)
+    previous = indicators.get_indicators("TEST", "1y", hist.iloc[:252])
+
+    # The period window moves forward: bars drop off the start as new ones arrive
+    slid = hist.iloc[10:262]
+    result = indicators.get_indicators("TEST", "1y", slid)
+
+    shared = len(slid) - 11
+    pd.testing.assert_frame_equal(result.iloc[:shared], previous.iloc[10:10 + shared])
+    pd.testing.assert_frame_equal(result.iloc[shared:], indicators.compute_indicators(slid).iloc[shared:],
+                                  rtol=1e-6, atol=1e-6)
+
+
+def test_short_sliding_window_is_recomputed():
+    indicators.indicator_cache.clear()
+    hist = generate_history("TEST", "1y", last_price=100)
+    indicators.get_indicators("TEST", "3mo", hist.iloc[:63])
+
+    slid = hist.iloc[5:68]
+    assert_matches_full_recompute(indicators.get_indicators("TEST", "3mo", slid), slid)
@@ -0,0 +1,20 @@
+from intent_index import IntentIndex
+
+
+def test_add_before_fit_fits_the_index():
+    index = IntentIndex()
+    index.add("stock price")
+    index.add("savings account")
+
+    assert index.keys == ["stock price", "savings account"]
+    assert index.match("what is the stock price")[0] == "stock price"
+
+
+def test_add_after_fit_extends_the_index():
+    index = IntentIndex().fit(["stock price", "savings account", "market news"])
+    index.add("savings account")
+    index.add("news today")
+
+    assert index.keys == ["stock price", "market news", "savings account", "news today"]
+    assert index.matrix.shape[0] == 4
+    assert index.match("open a savings account")[0] == "savings account"
@@ -0,0 +1,53 @@
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import market_data
+from synthetic_data import generate_history
+
+
+def wait_until_landed(key, timeout=5):
+    # Done callbacks run in the worker thread just after result() returns
+    deadline = time.monotonic() + timeout
+    while key in market_data._in_flight and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_failed_fetch_is_retried():
+    market_data.history_cache.clear()
+    calls = []
+
+    def fetch():
+        calls.append(None)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        return "history"
+
+    key = ("TEST", "1mo")
+    with pytest.raises(OSError):
+        market_data._fetch_once(market_data.history_cache, key, fetch).result()
+    wait_until_landed(key)
+    assert key not in market_data._in_flight
+    assert market_data.history_cache.get(key) is None
+
+    assert market_data._fetch_once(market_data.history_cache, key, fetch).result() == "history"
+    assert len(calls) == 2
+    wait_until_landed(key)
+    assert market_data.history_cache.get(key) == "history"
+
+
+def test_download_failures_come_from_the_returned_frame(monkeypatch):
+    def download(tickers, **kwargs):
+        frames = {ticker: generate_history(ticker, "1mo")[market_data.HISTORY_COLUMNS] for ticker in ["OK", "NAN"]}
+        frames["NAN"] = frames["NAN"] * np.nan
+        return pd.concat(frames, axis=1)
+
+    monkeypatch.setattr(market_data, "yf", SimpleNamespace(download=download))
+    frames, errors = market_data._download_histories(["OK", "NAN", "GONE"], "1mo")
+
+    assert list(frames) == ["OK"]
+    assert list(frames["OK"].columns) == market_data.HISTORY_COLUMNS + market_data.ACTION_COLUMNS
+    assert errors == {"NAN": "No historical data", "GONE": "No data returned"}
@@ -0,0 +1,76 @@
+import http.server
+import threading
+from pathlib import Path
+
+import pytest
+
+import news
+
+PAGE = (Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures" / "yahoo_search.html").read_bytes()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    """Local server answering with scripted ``(status, headers)`` responses; records request headers."""
+    monkeypatch.setattr(news, "BACKOFF", 0)
+    news.revalidation_cache.clear()
+    responses, requests = [], []
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(dict(self.headers))
+            status, headers = responses.pop(0)
+            body = PAGE if status == 200 else b""
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            if status != 304:
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_port}", responses, requests
+    httpd.shutdown()
+
+
+def test_not_modified_reuses_parsed_articles(server):
+    base_url, responses, requests = server
+    responses += [(200, {"ETag": '"v1"'}), (304, {"ETag": '"v1"'})]
+
+    articles = news.fetch_news("apple", base_url)
+    assert articles
+    assert news.fetch_news("apple", base_url) is articles
+    assert "If-None-Match" not in requests[0]
+    assert requests[1]["If-None-Match"] == '"v1"'
+
+
+def test_last_modified_is_sent_back(server):
+    base_url, responses, requests = server
+    last_modified = "Wed, 01 Jan 2025 00:00:00 GMT"
+    responses += [(200, {"Last-Modified": last_modified}), (304, {})]
+
+    articles = news.fetch_news(None, base_url)
+    assert news.fetch_news(None, base_url) is articles
+    assert requests[1]["If-Modified-Since"] == last_modified
+
+
+def test_server_error_is_retried(server):
+    base_url, responses, requests = server
+    responses += [(503, {}), (200, {})]
+
+    assert news.fetch_news("apple", base_url)
+    assert len(requests) == 2
+
+
+def test_gives_up_after_max_retries(server):
+    base_url, responses, requests = server
+    responses += [(502, {})] * (news.MAX_RETRIES + 1)
+
+    with pytest.raises(news.NewsFetchError, match="HTTP 502"):
+        news.fetch_news("apple", base_url)
+    assert len(requests) == news.MAX_RETRIES + 1
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+import portfolio
+from synthetic_data import generate_history
+
+
+def make_prices(rows):
+    return pd.DataFrame({
+        "AAA": generate_history("AAA", "2y", last_price=100)["Close"],
+        "BBB": generate_history("BBB", "2y", last_price=50)["Close"],
+    }).iloc[:rows]
+
+
+def assert_same_valuation(result, expected):
+    for field in ["holdings", "invested", "equity", "cost_basis"]:
+        np.testing.assert_allclose(getattr(result, field), getattr(expected, field))
+    pd.testing.assert_frame_equal(result.positions, expected.positions)
+
+
+def test_sliding_window_extends_previous_valuation():
+    prices = make_prices(300)
+    lots = portfolio.make_lots([
+        {"ticker": "AAA", "shares": 10, "cost": 90, "date": None},
+        # Dated in the bars that drop off the start, and in the bars that are new
+        {"ticker": "BBB", "shares": 5, "cost": 40, "date": prices.index[3]},
+        {"ticker": "AAA", "shares": -4, "cost": 95, "date": prices.index[260]},
+    ])
+    previous = portfolio.value_portfolio(lots, prices.iloc[:250])
+
+    # Same length, 20 bars later: the period window moved forward
+    slid = prices.iloc[20:270]
+    assert portfolio._reusable_rows(previous.prices, slid) == (20, 229)
+    result = portfolio.extend_valuation(lots, slid, previous, 229, offset=20)
+    assert_same_valuation(result, portfolio.value_portfolio(lots, slid))
+
+
+def test_changed_first_bar_is_revalued():
+    prices = make_prices(100)
+    previous = portfolio.value_portfolio(portfolio.make_lots([{"ticker": "AAA", "shares": 1, "cost": 1}]),
+                                         prices.iloc[:80])
+
+    slid = prices.iloc[5:].copy()
+    slid.iloc[0, 0] += 1
+    assert portfolio._reusable_rows(previous.prices, slid) is None
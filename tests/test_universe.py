@@ -0,0 +1,17 @@
+import numpy as np
+
+import universe
+
+
+def test_market_caps_in_any_notation():
+    parsed = universe.parse_market_caps(["2.67T", "562.5B", "2.67E+12", "$1,500,000", "n/a"])
+    np.testing.assert_allclose(parsed.to_numpy(), [2.67e12, 562.5e9, 2.67e12, 1.5e6, np.nan])
+
+
+def test_missing_dividend_yield_fails_dividend_filters():
+    table = universe.from_infos({
+        "PAYS": {"longName": "Pays", "dividendYield": 0.02},
+        "NONE": {"longName": "Nothing reported"},
+    })
+    assert np.isnan(table.loc["NONE", "dividend_yield"])
+    assert list(universe.screen(table, min_dividend_yield=0).index) == ["PAYS"]
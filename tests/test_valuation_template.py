@@ -0,0 +1,21 @@
+from openpyxl import Workbook
+from openpyxl.worksheet.table import Table
+
+import valuation_template
+
+
+def test_blank_table_cell_reads_as_zero(tmp_path):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Data"
+    sheet.append(["Name", "Valeur", "Double"])
+    sheet.append(["filled", 4, "=Tableau1[[#This Row],[Valeur]]*2"])
+    sheet.append(["blank", None, "=Tableau1[[#This Row],[Valeur]]*2+1"])
+    sheet.add_table(Table(displayName="Tableau1", ref="A1:C3"))
+    path = tmp_path / "blank.xlsx"
+    workbook.save(path)
+
+    values = valuation_template.compile_workbook(str(path)).evaluate()
+
+    assert values["Data!C2"] == 8.0
+    assert values["Data!C3"] == 1.0
@@ -0,0 +1,64 @@
+import re
+from functools import lru_cache
+from string import punctuation
+
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+from nltk.tokenize import word_tokenize
+
+# Compiled once for every call
+NON_ALPHA = re.compile(r'[^a-zA-Z]')
+BRACKETED = re.compile(r'\[.*?\]')
+WHITESPACE = re.compile(r'\s+')
+
+
+class TextPreprocessor:
+    """
+    Text cleaning, tokenizing, stopword filtering and lemmatizing for the chatbot.
+
+    The stoplist and lemmatizer are built once, and lemmas are memoized per token in a
+    bounded LRU cache, so repeated words cost a dictionary lookup.
+    """
+
+    def __init__(self, language="english", cache_size=8192):
+        # Build a stoplist of stopwords + punctuation
+        self.stoplist = frozenset(stopwords.words(language) + list(punctuation))
+        self.lemmatizer = WordNetLemmatizer()
+        self.lemmatize = lru_cache(maxsize=cache_size)(self.lemmatizer.lemmatize)
+
+    def clean(self, text):
+        """
+        Cleans text by:
+          1) Removing non-alphabetic characters.
+          2) Removing bracketed content [ ... ] (if any).
+          3) Converting multiple spaces into a single space.
+        """
+        text = NON_ALPHA.sub(' ', text)
+        text = BRACKETED.sub(' ', text)
+        return WHITESPACE.sub(' ', text).strip()
+
+    def preprocess(self, text):
+        text = self.clean(text)
+
+        # Cleaned text has no punctuation left, so it is a single "sentence";
+        # skipping sentence splitting gives the same tokens without loading punkt
+        tokens = word_tokenize(text.lower(), preserve_line=True)
+
+        # Filter out stopwords and non-alphanumeric tokens, then lemmatize
+        return ' '.join(
+            self.lemmatize(word) for word in tokens
+            if word.isalnum() and word not in self.stoplist
+        )
+
+    def preprocess_many(self, texts):
+        """Preprocess a batch of texts; duplicates in the batch are processed once."""
+        done = {}
+        results = []
+        for text in texts:
+            if text not in done:
+                done[text] = self.preprocess(text)
+            results.append(done[text])
+        return results
+
+    def cache_info(self):
+        return self.lemmatize.cache_info()
@@ -0,0 +1,165 @@
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from market_data import DEMO_STOCKS
+
+# CSV or Parquet file with one row per ticker; the five DEMO_STOCKS are used when unset
+UNIVERSE_FILE = os.environ.get("UNIVERSE_FILE")
+
+# Columns of the universe table, indexed by ticker. dividend_yield and percent_change
+# are percentages, market_cap is in dollars.
+COLUMNS = ["name", "sector", "price", "change", "percent_change", "market_cap", "pe_ratio", "dividend_yield"]
+NUMERIC_COLUMNS = ["price", "change", "percent_change", "market_cap", "pe_ratio", "dividend_yield"]
+
+# Columns the screener can sort by, with their display names
+SORT_COLUMNS = {
+    "market_cap": "Market Cap",
+    "percent_change": "Price Change",
+    "pe_ratio": "P/E Ratio",
+    "dividend_yield": "Dividend Yield",
+    "price": "Price",
+    "name": "Name",
+}
+
+MARKET_CAP_SUFFIXES = {"": 1.0, "K": 1e3, "M": 1e6, "B": 1e9, "T": 1e12}
+
+
+def parse_market_caps(values):
+    """
+    Vectorized parse_market_cap: numbers pass through, numeric strings (including scientific
+    notation like "2.67E+12") are converted and strings like "2.67T" or "562.5B" are scaled.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(float)
+    cleaned = values.astype(str).str.upper().str.replace(r"[$,\s]", "", regex=True)
+    parts = cleaned.str.extract(r"^([\d.]+)([KMBT]?)$")
+    scaled = pd.to_numeric(parts[0], errors="coerce") * parts[1].map(MARKET_CAP_SUFFIXES)
+    return pd.to_numeric(cleaned, errors="coerce").astype(float).fillna(scaled)
+
+
+def normalize(frame):
+    """A raw ticker table as the universe layout: ticker index, numeric columns, categorical sector."""
+    frame = frame.rename(columns=str.lower)
+    if "ticker" in frame.columns:
+        frame = frame.set_index("ticker")
+    frame.index = frame.index.astype(str).str.upper().rename("ticker")
+    frame = frame[~frame.index.duplicated()].reindex(columns=COLUMNS)
+
+    frame["market_cap"] = parse_market_caps(frame["market_cap"])
+    for column in NUMERIC_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce").astype(float)
+    if frame["percent_change"].isna().all() and frame["change"].notna().any():
+        frame["percent_change"] = frame["change"] / (frame["price"] - frame["change"]) * 100
+    frame["name"] = frame["name"].fillna(pd.Series(frame.index, index=frame.index))
+    frame["sector"] = frame["sector"].fillna("Unknown").astype("category")
+    return frame
+
+
+def from_demo_stocks():
+    return normalize(pd.DataFrame.from_dict(DEMO_STOCKS, orient="index"))
+
+
+def from_infos(infos):
+    """Universe rows from yfinance-style info dictionaries, e.g. ``get_stock_data_many``'s."""
+    rows = {}
+    for ticker, info in infos.items():
+        price, previous = info.get("regularMarketPrice"), info.get("previousClose")
+        change = price - previous if price is not None and previous is not None else None
+        dividend_yield = info.get("dividendYield")
+        rows[ticker] = {
+            "name": info.get("longName"),
+            "sector": info.get("sector"),
+            "price": price,
+            "change": change,
+            "percent_change": change / previous * 100 if change is not None and previous else None,
+            "market_cap": info.get("marketCap"),
+            "pe_ratio": info.get("trailingPE"),
+            # Missing stays NaN, so dividend filters drop it instead of reading it as no dividend
+            "dividend_yield": dividend_yield * 100 if dividend_yield is not None else None,
+        }
+    return normalize(pd.DataFrame.from_dict(rows, orient="index", columns=COLUMNS))
+
+
+def read_universe(path):
+    if path.endswith(".parquet"):
+        return normalize(pd.read_parquet(path))
+    return normalize(pd.read_csv(path))
+
+
+@lru_cache(maxsize=4)
+def _load(path, mtime):
+    return read_universe(path) if path else from_demo_stocks()
+
+
+def load_universe(path=None):
+    """The universe table for ``path`` (default UNIVERSE_FILE), read again only when the file changes."""
+    path = path or UNIVERSE_FILE
+    return _load(path, os.path.getmtime(path) if path else None)
+
+
+def screen(universe, sectors=None, min_pe=None, max_pe=None, min_dividend_yield=None,
+           min_market_cap=None, max_market_cap=None, min_change=None, max_change=None,
+           sort_by="market_cap", ascending=False, limit=None):
+    """
+    Rows of ``universe`` that pass every given filter, sorted by ``sort_by``.
+
+    Each filter is one boolean mask over a whole column, so screening thousands of
+    tickers takes about as long as a handful. Bounds are inclusive, percentages are
+    in percent and market caps in dollars; rows missing a filtered value are dropped.
+    """
+    mask = np.ones(len(universe), dtype=bool)
+    if sectors:
+        mask &= universe["sector"].isin(sectors).to_numpy()
+
+    bounds = [
+        ("pe_ratio", min_pe, max_pe),
+        ("dividend_yield", min_dividend_yield, None),
+        ("market_cap", min_market_cap, max_market_cap),
+        ("percent_change", min_change, max_change),
+    ]
+    for column, low, high in bounds:
+        values = universe[column].to_numpy()
+        if low is not None:
+            mask &= values >= low
+        if high is not None:
+            mask &= values <= high
+
+    result = universe[mask]
+    if sort_by:
+        if sort_by not in SORT_COLUMNS:
+            raise ValueError(f"Can't sort by {sort_by!r}, use one of {list(SORT_COLUMNS)}")
+        order = np.argsort(result[sort_by].to_numpy(), kind="stable")
+        if not ascending:
+            # Reverse for descending, keeping missing values last
+            missing = result[sort_by].isna().to_numpy()[order]
+            order = np.concatenate([order[~missing][::-1], order[missing]])
+        result = result.iloc[order]
+    return result.iloc[:limit] if limit else result
+
+
+def main(argv=None):
+    """Write a universe file from quote info, e.g. ``python universe.py -o universe.csv AAPL NVDA KO``."""
+    import argparse
+
+    import market_data
+
+    parser = argparse.ArgumentParser(description="Build a universe file for the stock screener")
+    parser.add_argument("tickers", nargs="+", help="tickers to include")
+    parser.add_argument("-o", "--output", default="universe.csv", help="CSV or .parquet file (default universe.csv)")
+    args = parser.parse_args(argv)
+
+    _, infos, errors = market_data.get_stock_data_many(args.tickers, "5d")
+    universe = from_infos({ticker: info for ticker, info in infos.items() if not errors.get(ticker, "").startswith("info")})
+    if args.output.endswith(".parquet"):
+        universe.to_parquet(args.output)
+    else:
+        universe.to_csv(args.output)
+    print(f"Wrote {len(universe)} tickers to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Model", "Evaluate_Stock.xlsx")
+
+# The template's headline results
+OUTPUTS = {
+    "score": "Score!J1",
+    "intrinsic_value": "Score!P1",
+    "intrinsic_value_with_margin": "Score!Q1",
+}
+
+TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<string>"[^"]*")
+  | (?P<table>[A-Za-z_][\w.]*\[\[\#This\ Row\],\s*\[(?P<column>[^\]]+)\]\])
+  | (?P<function>[A-Z][A-Z0-9.]*)\(
+  | (?P<ref>(?:(?:'(?P<quoted>[^']+)'|(?P<sheet>[A-Za-z_][\w.]*))!)?\$?[A-Z]{1,3}\$?\d+(?::\$?[A-Z]{1,3}\$?\d+)?)
+  | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+)
+  | (?P<operator><>|<=|>=|[-+*/^=<>(),&%])
+""", re.VERBOSE)
+
+CELL = re.compile(r"\$?([A-Z]{1,3})\$?(\d+)")
+
+OPERATORS = {"=": "==", "<>": "!=", "^": "**"}
+FUNCTIONS = {"IF": "_if", "SUM": "_sum", "AVERAGE": "_average", "ROUND": "_round", "SQRT": "np.sqrt",
+             "ABS": "np.abs", "MIN": "_min", "MAX": "_max"}
+
+
+def _if(condition, when_true, when_false=0.0):
+    return np.where(condition, when_true, when_false)
+
+
+def _cells(args):
+    # Ranges arrive as lists of their non-empty cells
+    for arg in args:
+        if isinstance(arg, list):
+            yield from arg
+        else:
+            yield arg
+
+
+def _sum(*args):
+    return sum(_cells(args), np.float64(0.0))
+
+
+def _average(*args):
+    values = list(_cells(args))
+    return sum(values) / len(values)
+
+
+def _min(*args):
+    return np.minimum.reduce(np.broadcast_arrays(*_cells(args)))
+
+
+def _max(*args):
+    return np.maximum.reduce(np.broadcast_arrays(*_cells(args)))
+
+
+def _round(value, digits=0):
+    # Excel rounds halves away from zero, unlike np.round
+    scale = 10.0 ** digits
+    return np.sign(value) * np.floor(np.abs(value) * scale + 0.5) / scale
+
+
+def column_index(letters):
+    index = 0
+    for letter in letters:
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index
+
+
+def column_letters(index):
+    letters = ""
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+class ValuationTemplate:
+    """
+    The valuation workbook compiled into a single vectorized function.
+
+    Every numeric constant cell is an input, every formula cell an output. Formulas are
+    translated to numpy expressions once, in dependency order, so evaluating the model for
+    one stock or for thousands is the same single call.
+    """
+
+    def __init__(self, inputs, formulas, labels, source):
+        self.inputs = inputs  # address -> default value
+        self.formulas = formulas  # address -> Python expression
+        self.labels = labels  # address -> row label from column A
+        self.order = self._dependency_order()
+        self.source = source
+        self._function = self._compile()
+
+    def _dependency_order(self):
+        order, state = [], {}
+
+        def visit(address):
+            if state.get(address) == "done":
+                return
+            if state.get(address) == "visiting":
+                raise ValueError(f"Circular reference at {address}")
+            state[address] = "visiting"
+            for dependency in re.findall(r'v\["([^"]+)"\]', self.formulas[address]):
+                if dependency in self.formulas:
+                    visit(dependency)
+            state[address] = "done"
+            order.append(address)
+
+        for address in self.formulas:
+            visit(address)
+        return order
+
+    def _compile(self):
+        lines = ["def evaluate(v):"]
+        lines += [f'    v["{address}"] = {self.formulas[address]}' for address in self.order]
+        lines.append("    return v")
+        namespace = {"np": np, "_if": _if, "_sum": _sum, "_average": _average, "_round": _round,
+                     "_min": _min, "_max": _max}
+        exec(compile("\n".join(lines), f"<{self.source}>", "exec"), namespace)
+        return namespace["evaluate"]
+
+    def address(self, name):
+        """Cell address for an input given by address (``"Score!B5"``) or by its row label."""
+        if name in self.inputs:
+            return name
+        matches = [address for address in self.inputs if self.labels.get(address) == name]
+        if len(matches) == 1:
+            return matches[0]
+        if matches:
+            raise KeyError(f"{name!r} is ambiguous, use one of {matches}")
+        raise KeyError(f"Unknown template input {name!r}")
+
+    def evaluate(self, inputs=None):
+        """
+        Evaluate the model. ``inputs`` maps input names or addresses to scalars or arrays;
+        anything missing takes the template's value. Returns address -> array for every cell.
+        """
+        values = {address: np.asarray(default, dtype=float) for address, default in self.inputs.items()}
+        for name, value in (inputs or {}).items():
+            values[self.address(name)] = np.asarray(value, dtype=float)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return self._function(values)
+
+    def evaluate_frame(self, frame, outputs=None):
+        """
+        Value every row of ``frame`` (columns are input names, e.g. one row per ticker).
+        Returns a DataFrame with the same index and one column per output.
+        """
+        outputs = outputs or OUTPUTS
+        values = self.evaluate({column: frame[column].to_numpy(dtype=float) for column in frame.columns})
+        return pd.DataFrame(
+            {name: np.broadcast_to(values[address], (len(frame),)) for name, address in outputs.items()},
+            index=frame.index,
+        )
+
+
+def _tables(workbook):
+    """Structured table name -> (sheet title, {header: column index})."""
+    tables = {}
+    for sheet in workbook.worksheets:
+        for name, ref in sheet.tables.items():
+            first, _, last = ref.partition(":")
+            first_column, header_row = CELL.match(first).groups()
+            last_column = CELL.match(last).group(1)
+            headers = {}
+            for index in range(column_index(first_column), column_index(last_column) + 1):
+                headers[sheet.cell(int(header_row), index).value] = index
+            tables[name] = (sheet.title, headers)
+    return tables
+
+
+def translate(formula, sheet, row, non_empty, tables):
+    """Translate one Excel formula (without its leading '=') into a numpy expression."""
+    parts, position = [], 0
+    while position < len(formula):
+        match = TOKEN.match(formula, position)
+        if match is None:
+            raise ValueError(f"Unsupported syntax in {formula!r} at {formula[position:]!r}")
+        position = match.end()
+
+        if match.group("space"):
+            continue
+        if match.group("table"):
+            table = match.group("table").split("[", 1)[0]
+            table_sheet, headers = tables[table]
+            address = f"{table_sheet}!{column_letters(headers[match.group('column')])}{row}"
+            # Empty table cells read as zero, like plain references
+            parts.append(f'v["{address}"]' if address in non_empty else "0.0")
+        elif match.group("ref"):
+            target_sheet = match.group("quoted") or match.group("sheet") or sheet
+            reference = match.group("ref").rsplit("!", 1)[-1].replace("$", "")
+            if ":" in reference:
+                (first_column, first_row), (last_column, last_row) = CELL.findall(reference)
+                cells = [
+                    f'v["{target_sheet}!{column_letters(column)}{cell_row}"]'
+                    for cell_row in range(int(first_row), int(last_row) + 1)
+                    for column in range(column_index(first_column), column_index(last_column) + 1)
+                    if f"{target_sheet}!{column_letters(column)}{cell_row}" in non_empty
+                ]
+                parts.append(f"[{', '.join(cells)}]")
+            elif f"{target_sheet}!{reference}" in non_empty:
+                parts.append(f'v["{target_sheet}!{reference}"]')
+            else:
+                # Empty cells read as zero
+                parts.append("0.0")
+        elif match.group("number"):
+            parts.append(match.group("number"))
+        elif match.group("function"):
+            name = match.group("function")
+            if name not in FUNCTIONS:
+                raise ValueError(f"Unsupported function {name} in {formula!r}")
+            parts.append(FUNCTIONS[name] + "(")
+        elif match.group("operator"):
+            operator = match.group("operator")
+            if operator in "&%":
+                raise ValueError(f"Unsupported operator {operator!r} in {formula!r}")
+            parts.append(OPERATORS.get(operator, operator))
+        else:
+            raise ValueError(f"Unsupported value {match.group()!r} in {formula!r}")
+    return " ".join(parts)
+
+
+def compile_workbook(path):
+    """Read a valuation workbook's inputs and formulas and compile them."""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(path)
+    tables = _tables(workbook)
+    constants, raw_formulas, labels = {}, {}, {}
+
+    for sheet in workbook.worksheets:
+        for cells in sheet.iter_rows():
+            for cell in cells:
+                if cell.value is None or not hasattr(cell, "column_letter"):
+                    continue
+                address = f"{sheet.title}!{cell.coordinate}"
+                if isinstance(cell.value, str) and cell.value.startswith("="):
+                    raw_formulas[address] = (sheet.title, cell.row, cell.value[1:])
+                elif isinstance(cell.value, (int, float)) and not isinstance(cell.value, bool):
+                    constants[address] = float(cell.value)
+                    label = sheet.cell(cell.row, 1).value
+                    if isinstance(label, str) and cell.column > 1:
+                        labels[address] = label.strip()
+
+    non_empty = set(constants) | set(raw_formulas)
+    formulas = {
+        address: translate(formula, sheet, row, non_empty, tables)
+        for address, (sheet, row, formula) in raw_formulas.items()
+    }
+    return ValuationTemplate(constants, formulas, labels, os.path.basename(path))
+
+
+@lru_cache(maxsize=None)
+def load_template(path=DEFAULT_TEMPLATE):
+    """The compiled template for ``path``, read from disk only once per process."""
+    return compile_workbook(path)